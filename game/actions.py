@@ -0,0 +1,122 @@
+from game.commands import complete_from, register_command, run_command, split_commands
+from game.items import get_available_items, get_item_description, transfer_item, use_item
+from game.player import get_player_stats, get_player_status, move_player
+from game.world import (
+    change_location,
+    find_path,
+    get_available_locations,
+    get_current_location,
+    get_location_description,
+    get_world_graph,
+    interact_with_location,
+)
+from game.weather import apply_weather_effects, tick_weather
+from utils.output import say
+from utils.random_events import apply_random_event
+from utils.text_formatting import format_inventory, print_help
+
+
+def travel(player, world, destination):
+    """Walk the shortest route to a location, one connection at a time. Yields prompts from events on the way."""
+    path = find_path(world, destination)
+    if path is None:
+        say(f"You don't know a way to {destination or 'nowhere'}.")
+        return False
+    if len(path) == 1:
+        say(f"You are already in the {path[0]}.")
+        return False
+    say(f"You set off for the {path[-1]}: {' -> '.join(path)}")
+    for location in path[1:]:
+        change_location(world, location)
+        move_player(player, location)
+        yield from apply_random_event(player, world)
+        if player["health"] == 0:
+            return False
+    return True
+
+def move(player, world, destination):
+    location = get_world_graph(world).find(destination)
+    if location and change_location(world, location):
+        move_player(player, location)
+        yield from apply_random_event(player, world)
+    else:
+        say(f"You can't go to {destination or 'nowhere'} from here.")
+
+def look(player, world, argument):
+    current_location = get_current_location(world)
+    say(get_location_description(world, current_location))
+    say(f"Items here: {format_inventory(get_available_items(world, current_location))}")
+    say(f"Paths lead to: {', '.join(get_available_locations(world))}")
+
+def show_inventory(player, world, argument):
+    say(f"Inventory: {format_inventory(player['inventory'])}")
+
+def pickup(player, world, item):
+    if not transfer_item(player, world, item, from_inventory_to_world=False):
+        say(f"There's no {item} here.")
+
+def drop(player, world, item):
+    transfer_item(player, world, item, from_inventory_to_world=True)
+
+def use(player, world, item):
+    return use_item(player, item, world)
+
+def examine(player, world, item):
+    if item in player["inventory"] or item in get_available_items(world, get_current_location(world)):
+        say(get_item_description(item))
+    else:
+        say(f"You don't see any {item} here.")
+
+def status(player, world, argument):
+    say(get_player_status(player))
+    say(get_player_stats(player))
+
+def interact(player, world, argument):
+    return interact_with_location(world, player)
+
+def show_help(player, world, argument):
+    print_help()
+
+
+def _nearby_location(player, world, argument):
+    return complete_from(argument, get_available_locations(world))
+
+def _any_location(player, world, argument):
+    return get_world_graph(world).complete(argument) or argument
+
+def _item_here(player, world, argument):
+    return complete_from(argument, get_available_items(world, get_current_location(world)))
+
+def _held_item(player, world, argument):
+    return complete_from(argument, player["inventory"].distinct())
+
+def _visible_item(player, world, argument):
+    held = player["inventory"].distinct()
+    return complete_from(argument, [*held, *(item for item in get_available_items(world, get_current_location(world)) if item not in held)])
+
+
+def perform_action(player, world, action):
+    """Perform a line typed at the main prompt: one command, or several separated by ";". Yields any follow-up prompts (see utils.prompts).
+
+    Each command that is understood takes a turn, and the weather moves on after it.
+    """
+    for command in split_commands(action):
+        if not (yield from run_command(player, world, command)):
+            continue
+        if player["health"] == 0:
+            return
+        tick_weather(world)
+        apply_weather_effects(player, world)
+
+
+register_command("move", move, aliases=("go",), complete=_nearby_location)
+register_command("travel", travel, complete=_any_location)
+register_command("look", look)
+register_command("inventory", show_inventory, aliases=("i", "inv"))
+register_command("pickup", pickup, aliases=("get", "take"), complete=_item_here)
+register_command("drop", drop, complete=_held_item)
+register_command("use", use, complete=_held_item)
+register_command("examine", examine, aliases=("x",), complete=_visible_item)
+register_command("status", status)
+register_command("interact", interact)
+register_command("help", show_help, aliases=("?",))
@@ -0,0 +1,116 @@
+"""The main prompt's commands.
+
+Verbs are registered with register_command() and compiled into a CommandTrie, so a command
+can be typed as its full verb, an alias, or any prefix that only one verb starts with
+("ex map" examines the map). A command's completer turns a shortened argument into the
+location or item name it stands for. A line can hold several commands separated by ";",
+which run one after another as if typed at separate prompts.
+"""
+from utils.output import say
+from utils.prompts import follow
+
+SEPARATOR = ";"
+
+COMMANDS = {}
+
+
+class CommandTrie:
+    """Words mapped to values, looked up by the word itself or any prefix shared by only one value.
+
+    resolve() answers from a table of every such word and prefix, compiled from the trie on
+    first use after an insert, so a lookup is one dict access.
+    """
+
+    __slots__ = ("_root", "_table")
+
+    def __init__(self):
+        self._root = {"": set()}
+        self._table = None
+
+    def insert(self, word, value):
+        # Every node keeps the values below it under "", so a prefix resolves without walking its subtree.
+        node = self._root
+        node[""].add(value)
+        for char in word:
+            node = node.setdefault(char, {"": set()})
+            node[""].add(value)
+        node[None] = value
+        self._table = None
+
+    def _compile(self):
+        table = {}
+        stack = [("", self._root)]
+        while stack:
+            prefix, node = stack.pop()
+            if None in node:
+                table[prefix] = node[None]
+            elif len(node[""]) == 1:
+                table[prefix] = next(iter(node[""]))
+            stack.extend((prefix + char, child) for char, child in node.items() if char)
+        self._table = table
+        return table
+
+    def _node(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def resolve(self, prefix):
+        """The value for a whole word or a prefix only one value has; None if there is no such value."""
+        return (self._table or self._compile()).get(prefix)
+
+    def candidates(self, prefix):
+        """Every value reachable from prefix."""
+        node = self._node(prefix)
+        return set() if node is None else set(node[""])
+
+
+VERBS = CommandTrie()
+
+def register_command(verb, handler, aliases=(), complete=None):
+    """Register a command for the main prompt.
+
+    Args:
+    verb (str): The command word
+    handler (callable): handler(player, world, argument); may be a prompting generator (see utils.prompts)
+    aliases (iterable): Other words for the same command
+    complete (callable): complete(player, world, argument) -> the full name a shortened argument stands for
+    """
+    COMMANDS[verb] = {"handler": handler, "complete": complete}
+    for word in (verb, *aliases):
+        VERBS.insert(word, verb)
+
+def complete_from(argument, names):
+    """The name argument matches exactly or is the only case-insensitive prefix of; otherwise argument itself."""
+    lowered = argument.lower()
+    matches = []
+    for name in names:
+        if name.lower() == lowered:
+            return name
+        if name.lower().startswith(lowered):
+            matches.append(name)
+    return matches[0] if len(matches) == 1 else argument
+
+def split_commands(line):
+    return [command.strip() for command in line.split(SEPARATOR) if command.strip()]
+
+def run_command(player, world, line):
+    """Run one command. Yields its prompts; returns False if the command wasn't understood."""
+    word, _, argument = line.strip().partition(" ")
+    verb = VERBS.resolve(word.lower())
+    if verb is None:
+        matches = VERBS.candidates(word.lower()) if word else set()
+        if len(matches) > 1:
+            say(f"'{word}' could mean {', '.join(sorted(matches))}.")
+        else:
+            say("I don't understand that command. Type 'help' to see available commands.")
+        return False
+    command = COMMANDS[verb]
+    argument = argument.strip()
+    if argument and command["complete"]:
+        argument = command["complete"](player, world, argument)
+    yield from follow(command["handler"](player, world, argument))
+    return True
@@ -5,190 +5,254 @@ from game.player import (
     damage_player,
     heal_player,
     move_player,
+    register_stat_item,
     remove_item_from_inventory,
 )
-from game.world import change_location, get_all_locations, get_available_locations
-from utils.random_events import generate_random_event
+from game.state import update_world_state
+from game.world import change_location, edit_location, get_all_locations, get_available_locations, get_map
+from utils.output import say
+from utils.prompts import follow
+from utils.random_events import compile_event_table, generate_random_event
 
+BERRIES_EVENTS = compile_event_table([("heal", 70), ("poison", 30)])
+MUSHROOMS_EVENTS = compile_event_table([("heal", 50), ("poison", 50)])
+ANCIENT_COIN_EVENTS = compile_event_table([("teleport", 50), ("reveal_secret", 50)])
+ANCIENT_ARTIFACT_EVENTS = compile_event_table([("wisdom", 40), ("curse", 30), (None, 30)])
 
-def get_item_description(item):
-    item_descriptions = {
-        "map": "An old, worn map of the surrounding area. It might help you navigate.",
-        "bread": "A fresh loaf of bread. It looks delicious and nutritious.",
-        "stick": "A sturdy wooden stick. It could be used as a simple weapon or tool.",
-        "berries": "A handful of colorful berries. They might be edible... or not.",
-        "torch": "A flaming torch that provides light in dark areas.",
-        "gemstone": "A sparkling gemstone. It looks valuable.",
-        "rope": "A coil of strong rope. Useful for climbing or tying things.",
-        "pickaxe": "A sturdy pickaxe. Perfect for mining or breaking through rocks.",
-        "mushrooms": "Some wild mushrooms. They could be edible or poisonous.",
-        "mountain_herbs": "Rare medicinal herbs found on the mountain. They might have healing properties.",
-        "ancient_coin": "An old coin with strange markings. It might be valuable to collectors.",
-        "hermit's_blessing": "A mystical blessing from the mountain hermit. It fills you with energy.",
-        "gold_coin": "A shiny gold coin. Standard currency in this realm.",
-        "silver_necklace": "A delicate silver necklace. It could fetch a good price.",
-        "ancient_artifact": "A mysterious object from a long-lost civilization. Its purpose is unknown.",
-        "magic_ring": "A ring imbued with magical properties. Its effects are yet to be discovered.",
-        "mysterious_potion": "A vial containing a strange, swirling liquid. Its effects are unknown.",
-        "sword": "A well-crafted sword with a sharp blade. Useful for combat and self-defense."
+
+ITEMS = {}
+
+def register_item(name, description, use=None, location_effects=None, consumable=False, modifiers=None):
+    """Register an item with use_item() and get_item_description().
+
+    Args:
+    name (str): The item name as it appears in inventories
+    description (str): Text shown when the item is examined
+    use (callable): use(player, world) handler, or None if the item can't be used; handlers
+        that ask the player something are generators yielding their prompts (see utils.prompts)
+    location_effects (dict): Location name -> handler used instead of use at that location
+    consumable (bool): Whether using the item removes it from the inventory
+    modifiers (dict): Stat -> amount added to the holder's effective stats while it is held
+
+    Item packs call this at import time to add items without editing this module.
+    """
+    ITEMS[name] = {
+        "description": description,
+        "use": use,
+        "location_effects": dict(location_effects or {}),
+        "consumable": consumable,
     }
-    return item_descriptions.get(item, "A mysterious item.")
+    if modifiers:
+        register_stat_item(name, **modifiers)
+
+def get_item_description(item):
+    entry = ITEMS.get(item)
+    return entry["description"] if entry else "A mysterious item."
 
 def use_item(player, item, world):
     if item not in player["inventory"]:
-        print(f"You don't have {item} in your inventory.")
+        say(f"You don't have {item} in your inventory.")
         return False
 
-    if item == "map":
-        print("You consult the map. It shows the following locations you can go to:")
-        available_locations = get_available_locations(world)
-        for location in available_locations:
-            print(f"- {location}")
-        return True
-    elif item == "bread":
-        print("You eat the bread. It's delicious and restores some health.")
-        heal_player(player, 20)
-        remove_item_from_inventory(player, item)
-        return True
-    elif item == "stick":
-        print("You wave the stick around. It makes a satisfying swoosh sound.")
-        if world["current_location"] == "Forest":
-            print("A nearby bird is startled and drops a shiny object!")
-            add_item_to_inventory(player, "gold_coin")
-        return True
-    elif item == "berries":
-        print("You eat the berries. They're sweet and juicy.")
-        if generate_random_event(events=[("heal", 70), ("poison", 30)]) == "heal":
-            print("You feel refreshed and gain some health.")
-            heal_player(player, 10)
-        else:
-            print("Uh oh, those weren't safe to eat. You lose some health.")
-            damage_player(player, 5)
-        remove_item_from_inventory(player, item)
-        return True
-    elif item == "torch":
-        current_location = world["current_location"]
-        if current_location == "Cave":
-            print("You light the torch, illuminating the dark cave around you.")
-            world["locations"]["Cave"]["description"] += " The cave is now well-lit by your torch."
-            return True
-        else:
-            print("You light the torch. It provides warmth and light.")
-            return True
-    elif item == "gemstone":
-        print("You examine the gemstone closely. It glimmers with an otherworldly light.")
-        if world["current_location"] == "Village":
-            print("A merchant notices your gemstone and offers to buy it for 50 gold!")
-            choice = input("Do you want to sell the gemstone? (y/n): ").lower()
-            if choice == 'y':
-                player["gold"] += 50
-                remove_item_from_inventory(player, item)
-                print("You sold the gemstone for 50 gold.")
-            else:
-                print("You decide to keep the gemstone.")
-        return True
-    elif item == "rope":
-        if world["current_location"] == "Mountain":
-            print("You use the rope to safely navigate a treacherous part of the mountain.")
-            heal_player(player, 5)
-            print("Your climbing technique improves, and you feel more confident.")
-        else:
-            print("You coil and uncoil the rope. It might be useful in the right situation.")
-        return True
-    elif item == "pickaxe":
-        print("You swing the pickaxe, but there's nothing here to mine.")
-        return True
-    elif item == "mushrooms":
-        print("You decide to eat the mushrooms.")
-        if generate_random_event(events=[("heal", 50), ("poison", 50)]) == "heal":
-            print("The mushrooms were edible and restore some health.")
-            heal_player(player, 20)
-        else:
-            print("The mushrooms were poisonous! You feel sick.")
-            damage_player(player, 10)
-        remove_item_from_inventory(player, item)
-        return True
-    elif item == "mountain_herbs":
-        print("You brew a tea with the mountain herbs and drink it.")
-        heal_player(player, 30)
-        print("You feel invigorated and ready for more adventures!")
-        remove_item_from_inventory(player, item)
-        return True
-    elif item == "ancient_coin":
-        print("You flip the ancient coin. As it spins in the air, you feel a strange energy...")
-        if generate_random_event(events=[("teleport", 50), ("reveal_secret", 50)]) == "teleport":
-            new_location = random.choice(get_all_locations(world))
-            change_location(world, new_location)
-            move_player(player, new_location)
-            print(f"The coin vanishes and you find yourself teleported to {new_location}!")
-        else:
-            print("The coin glows and reveals a secret about your current location!")
-            # You might want to add some location-specific secrets here
-        remove_item_from_inventory(player, item)
-        return True
-    elif item == "hermit's_blessing":
-        print("You invoke the hermit's blessing. A warm, comforting light envelops you.")
-        heal_player(player, 50)
-        print("You feel completely refreshed and your mind is clear.")
+    entry = ITEMS.get(item)
+    handler = entry and entry["location_effects"].get(world["current_location"], entry["use"])
+    if handler is None:
+        say(f"You're not sure how to use the {item}.")
+        return False
+
+    yield from follow(handler(player, world))
+    if entry["consumable"]:
         remove_item_from_inventory(player, item)
-        return True
-    elif item == "sword":
-        print("You swing the sword, practicing your combat moves.")
-        if world["current_location"] == "Forest":
-            print("Your sword slices through some thick vines, revealing a hidden path!")
-            # update_world_state(world, "reveal_hidden_path")
-        return True
-    elif item == "gold_coin":
-        print("You flip the gold coin. It catches the light, shimmering brilliantly.")
-        if world["current_location"] == "Village":
-            print("A street vendor notices your coin and offers you a mysterious potion in exchange.")
-            choice = input("Do you want to trade the gold coin for the potion? (y/n): ").lower()
-            if choice == 'y':
-                remove_item_from_inventory(player, item)
-                add_item_to_inventory(player, "mysterious_potion")
-                print("You traded the gold coin for a mysterious potion.")
-            else:
-                print("You decide to keep the gold coin.")
-        return True
-    elif item == "silver_necklace":
-        print("You hold up the silver necklace, admiring its craftsmanship.")
-        if world["current_location"] == "Mountain":
-            print("The necklace begins to glow, revealing hidden runes on nearby rocks!")
-            print("You discover a secret path leading to a hidden cave.")
-            # update_world_state(world, "reveal_hidden_cave")
-        else:
-            print("The necklace sparkles beautifully, but nothing else happens.")
-        return True
-    elif item == "ancient_artifact":
-        print("You examine the ancient artifact closely, turning it over in your hands.")
-        if generate_random_event(events=[("wisdom", 40), ("curse", 30), (None, 30)]) == "wisdom":
-            print("Suddenly, knowledge of the ancient world floods your mind!")
-            print("You gain insight into the history of this land.")
-            # update_player_knowledge(player, "ancient_history")
-        elif generate_random_event(events=[("wisdom", 40), ("curse", 30), (None, 30)]) == "curse":
-            print("A dark energy emanates from the artifact, making you feel weak.")
-            damage_player(player, 10)
-            print("You quickly put the artifact away, feeling drained.")
-        else:
-            print("Despite its age, the artifact remains inert and mysterious.")
-        return True
+    return True
+
+
+def _use_map(player, world):
+    shown = get_map(world)
+    if len(shown) > 1:
+        say("You consult the map. Since you saw the land from the mountain peak, it shows every path:")
+        for location, connections in shown:
+            say(f"- {location}: {', '.join(connections)}")
+        if len(world["locations"]) > len(shown):
+            say(f"...and {len(world['locations']) - len(shown)} more places.")
+        return
+    say("You consult the map. It shows the following locations you can go to:")
+    available_locations = get_available_locations(world)
+    for location in available_locations:
+        say(f"- {location}")
+
+def _use_bread(player, world):
+    say("You eat the bread. It's delicious and restores some health.")
+    heal_player(player, 20)
+
+def _use_stick(player, world):
+    say("You wave the stick around. It makes a satisfying swoosh sound.")
+
+def _use_stick_in_forest(player, world):
+    _use_stick(player, world)
+    say("A nearby bird is startled and drops a shiny object!")
+    add_item_to_inventory(player, "gold_coin")
+
+def _use_berries(player, world):
+    say("You eat the berries. They're sweet and juicy.")
+    if generate_random_event(events=BERRIES_EVENTS) == "heal":
+        say("You feel refreshed and gain some health.")
+        heal_player(player, 10)
     else:
-        print(f"You're not sure how to use the {item}.")
-        return False
+        say("Uh oh, those weren't safe to eat. You lose some health.")
+        damage_player(player, 5)
+
+def _use_torch(player, world):
+    say("You light the torch. It provides warmth and light.")
+
+def _use_torch_in_cave(player, world):
+    say("You light the torch, illuminating the dark cave around you.")
+    update_world_state(world, "light_location", location=world["current_location"])
+
+def _use_gemstone(player, world):
+    say("You examine the gemstone closely. It glimmers with an otherworldly light.")
+
+def _use_gemstone_in_village(player, world):
+    _use_gemstone(player, world)
+    say("A merchant notices your gemstone and offers to buy it for 50 gold!")
+    choice = (yield "Do you want to sell the gemstone? (y/n): ").lower()
+    if choice == 'y':
+        player["gold"] += 50
+        remove_item_from_inventory(player, "gemstone")
+        say("You sold the gemstone for 50 gold.")
+    else:
+        say("You decide to keep the gemstone.")
+
+def _use_rope(player, world):
+    say("You coil and uncoil the rope. It might be useful in the right situation.")
+
+def _use_rope_on_mountain(player, world):
+    say("You use the rope to safely navigate a treacherous part of the mountain.")
+    heal_player(player, 5)
+    say("Your climbing technique improves, and you feel more confident.")
+
+def _use_pickaxe(player, world):
+    say("You swing the pickaxe, but there's nothing here to mine.")
+
+def _use_mushrooms(player, world):
+    say("You decide to eat the mushrooms.")
+    if generate_random_event(events=MUSHROOMS_EVENTS) == "heal":
+        say("The mushrooms were edible and restore some health.")
+        heal_player(player, 20)
+    else:
+        say("The mushrooms were poisonous! You feel sick.")
+        damage_player(player, 10)
+
+def _use_mountain_herbs(player, world):
+    say("You brew a tea with the mountain herbs and drink it.")
+    heal_player(player, 30)
+    say("You feel invigorated and ready for more adventures!")
+
+def _use_ancient_coin(player, world):
+    say("You flip the ancient coin. As it spins in the air, you feel a strange energy...")
+    if generate_random_event(events=ANCIENT_COIN_EVENTS) == "teleport":
+        new_location = random.choice(get_all_locations(world))
+        change_location(world, new_location)
+        move_player(player, new_location)
+        say(f"The coin vanishes and you find yourself teleported to {new_location}!")
+    else:
+        say("The coin glows and reveals a secret about your current location!")
+        # You might want to add some location-specific secrets here
+
+def _use_hermits_blessing(player, world):
+    say("You invoke the hermit's blessing. A warm, comforting light envelops you.")
+    heal_player(player, 50)
+    player.set_modifier("hermit's_blessing", agility=2, perception=3)
+    say("You feel completely refreshed and your mind is clear.")
+
+def _use_sword(player, world):
+    say("You swing the sword, practicing your combat moves.")
+
+def _use_sword_in_forest(player, world):
+    _use_sword(player, world)
+    say("Your sword slices through some thick vines, revealing a hidden path!")
+    update_world_state(world, "reveal_hidden_path", location=world["current_location"], to="Mountain")
+
+def _use_gold_coin(player, world):
+    say("You flip the gold coin. It catches the light, shimmering brilliantly.")
+
+def _use_gold_coin_in_village(player, world):
+    _use_gold_coin(player, world)
+    say("A street vendor notices your coin and offers you a mysterious potion in exchange.")
+    choice = (yield "Do you want to trade the gold coin for the potion? (y/n): ").lower()
+    if choice == 'y':
+        remove_item_from_inventory(player, "gold_coin")
+        add_item_to_inventory(player, "mysterious_potion")
+        say("You traded the gold coin for a mysterious potion.")
+    else:
+        say("You decide to keep the gold coin.")
+
+def _use_silver_necklace(player, world):
+    say("You hold up the silver necklace, admiring its craftsmanship.")
+    say("The necklace sparkles beautifully, but nothing else happens.")
+
+def _use_silver_necklace_on_mountain(player, world):
+    say("You hold up the silver necklace, admiring its craftsmanship.")
+    say("The necklace begins to glow, revealing hidden runes on nearby rocks!")
+    say("You discover a secret path leading to a hidden cave.")
+    update_world_state(world, "reveal_hidden_cave", location=world["current_location"])
+
+def _use_ancient_artifact(player, world):
+    say("You examine the ancient artifact closely, turning it over in your hands.")
+    outcome = generate_random_event(events=ANCIENT_ARTIFACT_EVENTS)
+    if outcome == "wisdom":
+        say("Suddenly, knowledge of the ancient world floods your mind!")
+        say("You gain insight into the history of this land.")
+        # update_player_knowledge(player, "ancient_history")
+    elif outcome == "curse":
+        say("A dark energy emanates from the artifact, making you feel weak.")
+        damage_player(player, 10)
+        say("You quickly put the artifact away, feeling drained.")
+    else:
+        say("Despite its age, the artifact remains inert and mysterious.")
+
+
+register_item("map", "An old, worn map of the surrounding area. It might help you navigate.", _use_map)
+register_item("bread", "A fresh loaf of bread. It looks delicious and nutritious.", _use_bread, consumable=True)
+register_item("stick", "A sturdy wooden stick. It could be used as a simple weapon or tool.", _use_stick,
+              {"Forest": _use_stick_in_forest})
+register_item("berries", "A handful of colorful berries. They might be edible... or not.", _use_berries, consumable=True)
+register_item("torch", "A flaming torch that provides light in dark areas.", _use_torch, {"Cave": _use_torch_in_cave})
+register_item("gemstone", "A sparkling gemstone. It looks valuable.", _use_gemstone, {"Village": _use_gemstone_in_village})
+register_item("rope", "A coil of strong rope. Useful for climbing or tying things.", _use_rope,
+              {"Mountain": _use_rope_on_mountain})
+register_item("pickaxe", "A sturdy pickaxe. Perfect for mining or breaking through rocks.", _use_pickaxe)
+register_item("mushrooms", "Some wild mushrooms. They could be edible or poisonous.", _use_mushrooms, consumable=True)
+register_item("mountain_herbs", "Rare medicinal herbs found on the mountain. They might have healing properties.",
+              _use_mountain_herbs, consumable=True)
+register_item("ancient_coin", "An old coin with strange markings. It might be valuable to collectors.",
+              _use_ancient_coin, consumable=True)
+register_item("hermit's_blessing", "A mystical blessing from the mountain hermit. It fills you with energy.",
+              _use_hermits_blessing, consumable=True)
+register_item("gold_coin", "A shiny gold coin. Standard currency in this realm.", _use_gold_coin,
+              {"Village": _use_gold_coin_in_village})
+register_item("silver_necklace", "A delicate silver necklace. It could fetch a good price.", _use_silver_necklace,
+              {"Mountain": _use_silver_necklace_on_mountain})
+register_item("ancient_artifact", "A mysterious object from a long-lost civilization. Its purpose is unknown.",
+              _use_ancient_artifact)
+register_item("magic_ring", "A ring imbued with magical properties. Its effects are yet to be discovered.",
+              modifiers={"agility": 2, "perception": 2})
+register_item("mysterious_potion", "A vial containing a strange, swirling liquid. Its effects are unknown.")
+register_item("sword", "A well-crafted sword with a sharp blade. Useful for combat and self-defense.", _use_sword,
+              {"Forest": _use_sword_in_forest})
 
 def get_available_items(world, location):
     return world["locations"][location]["items"]
 
 def add_item_to_world(world, location, item):
     if item not in world["locations"][location]["items"]:
-        world["locations"][location]["items"].append(item)
-        print(f"A {item} has been added to {location}.")
+        edit_location(world, location)["items"].append(item)
+        say(f"A {item} has been added to {location}.")
     else:
-        print(f"There's already a {item} in {location}.")
+        say(f"There's already a {item} in {location}.")
 
 def remove_item_from_world(world, location, item):
     if item in world["locations"][location]["items"]:
-        world["locations"][location]["items"].remove(item)
+        edit_location(world, location)["items"].remove(item)
         return True
     return False
 
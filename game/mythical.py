@@ -1,4 +1,5 @@
 from game.player import add_item_to_inventory, heal_player
+from utils.output import say
 
 
 def summon_mythical_creature(world, player, creature_type):
@@ -14,16 +15,16 @@ def summon_mythical_creature(world, player, creature_type):
     bool: True if summoning was successful, False otherwise
     """
     if creature_type == "phoenix":
-        print("A majestic phoenix appears in a burst of flames!")
+        say("A majestic phoenix appears in a burst of flames!")
         heal_player(player, 50)
     elif creature_type == "unicorn":
-        print("A graceful unicorn materializes before you!")
+        say("A graceful unicorn materializes before you!")
         add_item_to_inventory(player, "unicorn_hair")
     elif creature_type == "dragon":
-        print("A powerful dragon descends from the sky! The dragon is friendly and will help you.")
+        say("A powerful dragon descends from the sky! The dragon is friendly and will help you.")
         add_item_to_inventory(player, "dragon_scale")
     else:
-        print(f"Unknown creature type: {creature_type}")
+        say(f"Unknown creature type: {creature_type}")
         return False
 
     return True
@@ -1,41 +1,213 @@
+from utils.output import say
 from utils.text_formatting import format_inventory, print_game_over
 
+MAX_HEALTH = 100
+BASE_STAT = 10
+MIN_STAT = 1
+STATS = ("agility", "perception")
+
+STAT_ITEMS = {}
+
+def register_stat_item(item, **modifiers):
+    """Make holding item add modifiers (stat -> amount) to the holder's effective stats."""
+    STAT_ITEMS[item] = modifiers
+
+
+class Inventory:
+    """A multiset of item names. Membership, add and remove are O(1) and repeated items share one counted stack."""
+
+    __slots__ = ("_counts", "_size")
+
+    def __init__(self, items=()):
+        self._counts = {}
+        self._size = 0
+        for item in items:
+            self.append(item)
+
+    def append(self, item):
+        self._counts[item] = self._counts.get(item, 0) + 1
+        self._size += 1
+
+    def remove(self, item):
+        count = self._counts.get(item)
+        if not count:
+            raise ValueError(f"{item!r} is not in the inventory")
+        if count == 1:
+            del self._counts[item]
+        else:
+            self._counts[item] = count - 1
+        self._size -= 1
+
+    def count(self, item):
+        return self._counts.get(item, 0)
+
+    def distinct(self):
+        """The item names held, one entry per stack."""
+        return self._counts.keys()
+
+    def stacks(self):
+        """(item, count) pairs in the order the items were first picked up."""
+        return self._counts.items()
+
+    def to_list(self):
+        return list(self)
+
+    def __contains__(self, item):
+        return item in self._counts
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for item, count in self._counts.items():
+            for _ in range(count):
+                yield item
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Inventory({self.to_list()!r})"
+
+
+class Player:
+    """Player state in slots, with dict-style access so player["gold"] keeps working.
+
+    player["agility"] and player["perception"] are base stats. Weather, blessings and held
+    items add modifiers on top; stat() gives the effective value, computed when first asked
+    for and kept until a modifier, a base stat or the held stat items change. Keys other than
+    FIELDS (from a newer save, say) are kept in a plain dict and saved back unchanged.
+    """
+
+    FIELDS = ("name", "health", "inventory", "location", "gold", "agility", "perception", "modifiers")
+    __slots__ = FIELDS + ("_extra", "_stats", "_stats_items")
+
+    def __init__(self, name, health=MAX_HEALTH, inventory=(), location="Village", gold=100):
+        self.name = name
+        self.health = health
+        self.inventory = Inventory(inventory)
+        self.location = location
+        self.gold = gold
+        self.agility = BASE_STAT
+        self.perception = BASE_STAT
+        self.modifiers = {}
+        self._extra = {}
+        self._stats = None
+        self._stats_items = ()
+
+    def __getitem__(self, key):
+        if key not in Player.FIELDS:
+            return self._extra[key]
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in Player.FIELDS:
+            self._extra[key] = value
+            return
+        if key == "inventory" and not isinstance(value, Inventory):
+            value = Inventory(value)
+        setattr(self, key, value)
+        self._stats = None
+
+    def __contains__(self, key):
+        if key in Player.FIELDS:
+            return hasattr(self, key)
+        return key in self._extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """The save-file shape: a plain dict with the inventory as a list."""
+        data = {key: self[key] for key in Player.FIELDS if key in self}
+        data.update(self._extra)
+        data["inventory"] = self.inventory.to_list()
+        data["modifiers"] = {source: dict(modifiers) for source, modifiers in self.modifiers.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        player = cls(data["name"])
+        for key, value in data.items():
+            player[key] = value
+        return player
+
+    def set_modifier(self, source, **modifiers):
+        """Apply modifiers (stat -> amount) from source in place of any it had. Returns True if that changed anything."""
+        modifiers = {stat: amount for stat, amount in modifiers.items() if amount}
+        if self.modifiers.get(source, {}) == modifiers:
+            return False
+        if modifiers:
+            self.modifiers[source] = modifiers
+        else:
+            self.modifiers.pop(source, None)
+        self._stats = None
+        return True
+
+    def remove_modifier(self, source):
+        return self.set_modifier(source)
+
+    def stat(self, stat):
+        """The effective value of stat: base plus every active modifier, never below MIN_STAT."""
+        held = tuple(item for item in STAT_ITEMS if item in self.inventory)
+        if self._stats is None or held != self._stats_items:
+            stats = {name: getattr(self, name) for name in STATS}
+            for modifiers in [*self.modifiers.values(), *(STAT_ITEMS[item] for item in held)]:
+                for name, amount in modifiers.items():
+                    stats[name] += amount
+            self._stats = {name: max(MIN_STAT, value) for name, value in stats.items()}
+            self._stats_items = held
+        return self._stats[stat]
+
+    def __repr__(self):
+        return f"Player({self.to_dict()!r})"
+
 
 def create_player(name):
-    return {
-        "name": name,
-        "health": 100,
-        "inventory": [],
-        "location": "Village",
-        "gold": 100
-    }
+    return Player(name)
 
 def get_player_status(player):
     return f"Health: {player['health']} | Inventory: {format_inventory(player['inventory'])} | Gold: {player['gold']}"
 
+def get_player_stats(player):
+    """Effective stats, with how far modifiers move each from its base."""
+    parts = []
+    for stat in STATS:
+        value, change = player.stat(stat), player.stat(stat) - player[stat]
+        parts.append(f"{stat.capitalize()}: {value}" + (f" ({change:+d})" if change else ""))
+    return " | ".join(parts)
+
 def add_item_to_inventory(player, item):
     player['inventory'].append(item)
-    print(f"You picked up: {item}")
+    say(f"You picked up: {item}")
 
 def remove_item_from_inventory(player, item):
     if item in player['inventory']:
         player['inventory'].remove(item)
-        print(f"You dropped: {item}")
+        say(f"You dropped: {item}")
         return True
     else:
-        print(f"You don't have {item} in your inventory.")
+        say(f"You don't have {item} in your inventory.")
 
 def move_player(player, new_location):
     player['location'] = new_location
-    print(f"You moved to: {new_location}")
+    say(f"You moved to: {new_location}")
 
 def heal_player(player, amount):
-    player['health'] = min(100, player['health'] + amount)
-    print(f"You healed for {amount} health. Current health: {player['health']}")
+    player['health'] = min(MAX_HEALTH, player['health'] + amount)
+    say(f"You healed for {amount} health. Current health: {player['health']}")
 
 def damage_player(player, amount):
     player['health'] = max(0, player['health'] - amount)
-    print(f"You took {amount} damage. Current health: {player['health']}")
+    say(f"You took {amount} damage. Current health: {player['health']}")
     if player['health'] == 0:
-        print("You have been defeated.")
+        say("You have been defeated.")
         print_game_over()
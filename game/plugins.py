@@ -0,0 +1,124 @@
+"""Location plugins: new places added to the game without editing it.
+
+A plugin is a module with a PLUGIN dict:
+
+    PLUGIN = {
+        "type": "Lake",                    # the location type its menu handles
+        "handler": "visit_lake",           # handler(world, player) in the same module
+        "locations": {"Lake": {...}},      # new locations, shaped like the world template's
+        "items": {"Village": ["rope"]},    # extra items placed in existing locations
+    }
+
+Connections from a plugin's locations are made both ways. Plugins are modules in the
+plugins/ directory next to the game, or modules that installed packages name as entry
+points in the ENTRY_POINT_GROUP group, as in ``[project.entry-points."kevins_adventure.locations"]``.
+Finding them means importing every plugin and reading every installed package's metadata,
+so what was found is cached in CACHE_FILE and reused while the plugin files, the entry-point
+plugins' modules and the package directories are unchanged. A plugin that fails to import is
+reported and skipped. Plugin modules themselves are then only imported when a player
+first interacts with one of their locations. game.world adds the plugins to the classic
+world when the first world is made. List them with ``python -m game.plugins``.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+from utils.output import say
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_DIRECTORY = os.path.join(ROOT, "plugins")
+PLUGIN_PACKAGE = "plugins"
+ENTRY_POINT_GROUP = "kevins_adventure.locations"
+CACHE_FILE = os.path.join(ROOT, "__pycache__", "location_plugins.json")
+CACHE_VERSION = 2
+
+
+def _fingerprint(module_files=()):
+    """Modification times of everything discovery depends on: the plugin files, the entry-point
+    plugins' module files from the last scan, and the package directories."""
+    paths = [PLUGIN_DIRECTORY]
+    if os.path.isdir(PLUGIN_DIRECTORY):
+        paths.extend(sorted(os.path.join(PLUGIN_DIRECTORY, name) for name in os.listdir(PLUGIN_DIRECTORY) if name.endswith(".py")))
+    paths.extend(module_files)
+    # The game's own directory changes with every save, and its plugins are covered above.
+    paths.extend(path for path in sys.path if path and os.path.abspath(path) != ROOT)
+    stamps = []
+    for path in paths:
+        try:
+            stamps.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            pass
+    return stamps
+
+def _describe(module_name):
+    """The cacheable metadata of the plugin in module_name, or None if it isn't a usable plugin."""
+    try:
+        module = importlib.import_module(module_name)
+        plugin = module.PLUGIN
+        return {
+            "module": module_name,
+            "file": getattr(module, "__file__", None),
+            "type": plugin["type"],
+            "handler": f"{module_name}:{plugin['handler']}",
+            "locations": plugin.get("locations", {}),
+            "items": plugin.get("items", {}),
+        }
+    except Exception as e:
+        # A broken plugin, even one that doesn't parse, must not stop the game from starting.
+        say(f"Skipping location plugin {module_name}: {e!r}")
+        return None
+
+def scan_plugins():
+    """Import every plugin in PLUGIN_DIRECTORY and every ENTRY_POINT_GROUP entry point, and describe them."""
+    from importlib.metadata import entry_points  # slow to import, and only needed when the cache is stale
+
+    modules = []
+    if os.path.isdir(PLUGIN_DIRECTORY):
+        modules.extend(f"{PLUGIN_PACKAGE}.{name[:-3]}" for name in sorted(os.listdir(PLUGIN_DIRECTORY))
+                       if name.endswith(".py") and not name.startswith("_"))
+    modules.extend(entry_point.module for entry_point in entry_points(group=ENTRY_POINT_GROUP))
+    return [plugin for plugin in map(_describe, modules) if plugin is not None]
+
+def discover_plugins(refresh=False):
+    """Every plugin's metadata, from CACHE_FILE when nothing it depends on has changed since it was written."""
+    if os.path.isdir(PLUGIN_DIRECTORY) and ROOT not in sys.path:
+        sys.path.append(ROOT)  # so plugins.<name> imports from anywhere
+    if not refresh:
+        try:
+            with open(CACHE_FILE) as cache_file:
+                cache = json.load(cache_file)
+            if cache["version"] == CACHE_VERSION and cache["fingerprint"] == _fingerprint(cache["files"]):
+                return cache["plugins"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    plugins = scan_plugins()
+    # Entry-point plugins live outside the plugin directory (an editable install, say), so their files are stamped too.
+    files = sorted({plugin["file"] for plugin in plugins if plugin["file"] and not plugin["file"].startswith(PLUGIN_DIRECTORY + os.sep)})
+    fingerprint = _fingerprint(files)
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        temporary_path = CACHE_FILE + ".tmp"
+        with open(temporary_path, "w") as cache_file:
+            json.dump({"version": CACHE_VERSION, "fingerprint": fingerprint, "files": files, "plugins": plugins}, cache_file)
+        os.replace(temporary_path, CACHE_FILE)
+    except OSError:
+        pass  # a read-only install rescans each launch
+    return plugins
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the location plugins the game will load.")
+    parser.add_argument("--refresh", action="store_true", help="rescan instead of using the cache")
+    args = parser.parse_args(argv)
+
+    plugins = discover_plugins(args.refresh)
+    if not plugins:
+        print("No location plugins found.")
+    for plugin in plugins:
+        print(f"{plugin['type']}: {plugin['handler']} adds {', '.join(plugin['locations']) or 'no locations'}")
+
+if __name__ == "__main__":
+    main()
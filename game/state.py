@@ -1,3 +1,124 @@
-def update_world_state(world, event):
-    # TODO: Implement this function
-    pass
+"""World events.
+
+update_world_state(world, event, **data) appends an event to the world's log and applies the
+reducer registered for it with register_event(). Reducers keep the world's event state:
+world flags (such as "map_revealed") and per-location flags (such as a cave being lit). They
+may also add locations and connections, as long as doing it twice changes nothing, since
+loading a save replays recent events over locations that already have them.
+
+A location's description is never edited to show what happened there. It is its base text
+followed by the note registered with register_note() for each of its flags, composed when
+asked for and memoized per (base text, flags) combination, so it stays the same size however
+often an event fires and every world with the same combination shares one string.
+
+Saves keep the state as a snapshot plus the events logged since. A new snapshot is taken
+every SNAPSHOT_INTERVAL events, so loading never replays more than that many.
+"""
+from functools import lru_cache
+
+SNAPSHOT_INTERVAL = 50
+DESCRIPTION_CACHE_SIZE = 1024
+NO_FLAGS = frozenset()
+
+REDUCERS = {}
+NOTES = {}
+
+def register_event(name, reducer):
+    """Register reducer(world, state, **data) as what happens when event name is fired."""
+    REDUCERS[name] = reducer
+
+def register_note(flag, note):
+    """Register the sentence added to a location's description while it has flag."""
+    NOTES[flag] = note
+    compose_description.cache_clear()
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def compose_description(description, flags):
+    """description followed by the notes for flags (a frozenset), in the order they were registered."""
+    if not flags:
+        return description
+    return " ".join([description, *(note for flag, note in NOTES.items() if flag in flags)])
+
+
+class WorldState:
+    """A world's event state, event log and the views derived from them."""
+
+    def __init__(self, snapshot=None, count=0):
+        self.snapshot = snapshot or {}
+        self.flags = dict(self.snapshot.get("flags", {}))
+        self.location_flags = {location: frozenset(flags) for location, flags in self.snapshot.get("location_flags", {}).items()}
+        self.count = count
+        self.log = []
+        self.skipped_events = []
+        self._new_events = []
+
+    @classmethod
+    def from_dict(cls, data, world):
+        """Rebuild the state saved by to_dict() by replaying the events after its snapshot.
+
+        Events nobody handles any more (from a removed plugin, or a newer version of the game)
+        are skipped rather than making the save unloadable, and listed in skipped_events for
+        the loader to warn about.
+        """
+        log = data.get("log", [])
+        state = cls(data.get("snapshot"), data.get("count", 0) - len(log))
+        for event, event_data in log:
+            if event in REDUCERS:
+                state.apply(world, event, event_data)
+            else:
+                state.skipped_events.append(event)
+        state._new_events.clear()
+        return state
+
+    def to_dict(self):
+        return {"count": self.count, "snapshot": self.snapshot, "log": list(self.log)}
+
+    def apply(self, world, event, data):
+        if event not in REDUCERS:
+            raise ValueError(f"Unknown world event: {event}")
+        REDUCERS[event](world, self, **data)
+        self.log.append([event, data])
+        self._new_events.append([event, data])
+        self.count += 1
+        if len(self.log) >= SNAPSHOT_INTERVAL:
+            self.snapshot = {
+                "flags": dict(self.flags),
+                "location_flags": {location: sorted(flags) for location, flags in self.location_flags.items() if flags},
+            }
+            self.log = []
+
+    def take_new_events(self):
+        """Events applied since the last call, for saving or sending only what changed."""
+        events, self._new_events = self._new_events, []
+        return events
+
+    def set_flag(self, flag, value=True):
+        self.flags[flag] = value
+
+    def flag(self, flag):
+        return self.flags.get(flag, False)
+
+    def add_location_flag(self, location, flag):
+        self.location_flags[location] = self.location_flags.get(location, NO_FLAGS) | {flag}
+
+    def remove_location_flag(self, location, flag):
+        self.location_flags[location] = self.location_flags.get(location, NO_FLAGS) - {flag}
+
+    def has_location_flag(self, location, flag):
+        return flag in self.location_flags.get(location, NO_FLAGS)
+
+    def describe(self, location, description):
+        """description with the notes for the location's flags."""
+        return compose_description(description, self.location_flags.get(location, NO_FLAGS))
+
+
+def get_world_state(world):
+    """The world's WorldState, created on first use or rebuilt from a save."""
+    state = world.get("state")
+    if not isinstance(state, WorldState):
+        state = world["state"] = WorldState.from_dict(state, world) if state else WorldState()
+    return state
+
+def update_world_state(world, event, **data):
+    """Log an event and apply it to the world."""
+    get_world_state(world).apply(world, event, data)
@@ -1,35 +1,116 @@
+"""Weather as a Markov chain.
+
+Each location type has a transition matrix over WEATHER_CONDITIONS, registered with
+register_weather(). The world's weather moves one step through the matrix of wherever the
+player is each turn (tick_weather()), and a random weather event forces a change
+(change_weather()). Forecasts and bulk advances use powers of the matrices, which are cached,
+so looking or jumping N turns ahead costs the same as one turn once a power has been built.
+"""
 import random
+from bisect import bisect
+from functools import lru_cache
+from itertools import accumulate
+
+from game.world import get_current_location, get_location_type
+from utils.output import say
+
+WEATHER_CONDITIONS = ("clear", "cloudy", "rainy", "stormy", "foggy", "windy")
+DEFAULT_WEATHER = "clear"
+DEFAULT_LOCATION_TYPE = "Village"
+FORECAST_TURNS = 3
+POWER_CACHE_SIZE = 256
+SEVERITY = {"clear": 0, "cloudy": 1, "windy": 1, "foggy": 2, "rainy": 2, "stormy": 3}
+WEATHER_MODIFIERS = {
+    "rainy": {"agility": -2},
+    "stormy": {"agility": -3, "perception": -3},
+    "foggy": {"perception": -4},
+    "windy": {"agility": -1},
+}
+WEATHER_EFFECTS = {
+    "rainy": "The rain is making the ground slippery. Be careful!",
+    "stormy": "The storm is making it hard to see and move around.",
+    "foggy": "The fog is reducing visibility significantly.",
+    "windy": "The strong wind is making it difficult to move quickly.",
+}
+
+TRANSITIONS = {}
+
+def register_weather(location_type, matrix):
+    """Register the weather transition matrix (one row per condition, in WEATHER_CONDITIONS order) for a location type."""
+    size = len(WEATHER_CONDITIONS)
+    if len(matrix) != size or any(len(row) != size or abs(sum(row) - 1.0) > 1e-9 for row in matrix):
+        raise ValueError(f"The weather matrix for {location_type} must be {size}x{size} with rows summing to 1.")
+    TRANSITIONS[location_type] = tuple(tuple(row) for row in matrix)
+    transition_power.cache_clear()
+    _cumulative_row.cache_clear()
+
+
+def _multiply(a, b):
+    return tuple(tuple(sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0]))) for i in range(len(a)))
+
+@lru_cache(maxsize=POWER_CACHE_SIZE)
+def transition_power(location_type, turns):
+    """The matrix of weather probabilities turns steps ahead, built by repeated squaring from cached powers."""
+    matrix = TRANSITIONS.get(location_type, TRANSITIONS[DEFAULT_LOCATION_TYPE])
+    if turns == 0:
+        return tuple(tuple(float(i == j) for j in range(len(matrix))) for i in range(len(matrix)))
+    if turns == 1:
+        return matrix
+    half = transition_power(location_type, turns // 2)
+    power = _multiply(half, half)
+    return _multiply(power, matrix) if turns % 2 else power
+
+@lru_cache(maxsize=POWER_CACHE_SIZE)
+def _cumulative_row(location_type, turns, weather, change=False):
+    row = list(transition_power(location_type, turns)[WEATHER_CONDITIONS.index(weather)])
+    if change:
+        row[WEATHER_CONDITIONS.index(weather)] = 0.0
+    return tuple(accumulate(row))
+
+def _draw(location_type, turns, weather, rng, change=False):
+    cumulative = _cumulative_row(location_type, turns, weather, change)
+    index = bisect(cumulative, rng.random() * cumulative[-1])
+    return WEATHER_CONDITIONS[min(index, len(WEATHER_CONDITIONS) - 1)]
+
+def _location_type(world):
+    return get_location_type(world, get_current_location(world))
 
 
 def get_current_weather(world):
-    if "weather" not in world:
-        world["weather"] = "clear"
+    if world.get("weather") not in WEATHER_CONDITIONS:
+        world["weather"] = DEFAULT_WEATHER
     return world["weather"]
 
-def change_weather(world):
-    weather_conditions = ["clear", "cloudy", "rainy", "stormy", "foggy", "windy"]
-    new_weather = random.choice(weather_conditions)
-    world["weather"] = new_weather
-    return new_weather
+def tick_weather(world, rng=random):
+    """Move the weather one turn along the chain for the current location. Returns the new weather."""
+    world["weather"] = _draw(_location_type(world), 1, get_current_weather(world), rng)
+    return world["weather"]
+
+def change_weather(world, rng=random):
+    """Force the weather to change, to a condition the current location's chain could move to."""
+    world["weather"] = _draw(_location_type(world), 1, get_current_weather(world), rng, change=True)
+    return world["weather"]
+
+def forecast(world, turns=FORECAST_TURNS):
+    """Probability of each condition turns turns from now, if the player stays where they are."""
+    row = transition_power(_location_type(world), turns)[WEATHER_CONDITIONS.index(get_current_weather(world))]
+    return dict(zip(WEATHER_CONDITIONS, row))
+
+def advance_weather(worlds, turns, rng=random):
+    """Advance many worlds' weather turns turns at once, each drawn straight from its cached matrix power.
+
+    Every world is assumed to stay at its current location for those turns.
+    """
+    for world in worlds:
+        world["weather"] = _draw(_location_type(world), turns, get_current_weather(world), rng)
 
 def apply_weather_effects(player, world):
+    """Make the player's weather modifier match the current weather. Says so and returns True only if it changed."""
     current_weather = get_current_weather(world)
-
-    if current_weather == "rainy":
-        print("The rain is making the ground slippery. Be careful!")
-        player["agility"] = max(1, player.get("agility", 10) - 2)
-    elif current_weather == "stormy":
-        print("The storm is making it hard to see and move around.")
-        player["agility"] = max(1, player.get("agility", 10) - 3)
-        player["perception"] = max(1, player.get("perception", 10) - 3)
-    elif current_weather == "foggy":
-        print("The fog is reducing visibility significantly.")
-        player["perception"] = max(1, player.get("perception", 10) - 4)
-    elif current_weather == "windy":
-        print("The strong wind is making it difficult to move quickly.")
-        player["agility"] = max(1, player.get("agility", 10) - 1)
-    else:
-        print("The weather is clear and doesn't affect your abilities.")
+    if not player.set_modifier("weather", **WEATHER_MODIFIERS.get(current_weather, {})):
+        return False
+    say(WEATHER_EFFECTS.get(current_weather, "The weather no longer affects your abilities."))
+    return True
 
 def describe_weather(world):
     current_weather = get_current_weather(world)
@@ -46,13 +127,50 @@ def describe_weather(world):
     return descriptions.get(current_weather, "The weather is unremarkable.")
 
 def weather_forecast(world):
-    """Use describe_weather() to get the current weather, then randomly choose a future weather condition."""
+    """Compare the current weather with the expected weather FORECAST_TURNS turns from now."""
     current_weather = get_current_weather(world)
-    future_weather = random.choice(["improve", "worsen", "stay the same"])
+    expected = forecast(world)
+    severity = sum(SEVERITY[weather] * chance for weather, chance in expected.items())
+    likely = max(expected, key=expected.get)
 
-    if future_weather == "improve":
-        return f"The current {current_weather} conditions are expected to improve soon."
-    elif future_weather == "worsen":
-        return f"The {current_weather} weather might get worse in the coming hours."
+    if severity < SEVERITY[current_weather] - 0.5:
+        return f"The current {current_weather} conditions are expected to improve soon ({likely} is most likely)."
+    elif severity > SEVERITY[current_weather] + 0.5:
+        return f"The {current_weather} weather might get worse in the coming hours ({likely} is most likely)."
     else:
         return f"The {current_weather} weather is likely to persist for a while."
+
+
+# Rows and columns follow WEATHER_CONDITIONS: clear, cloudy, rainy, stormy, foggy, windy.
+register_weather("Village", [
+    [0.60, 0.20, 0.08, 0.02, 0.05, 0.05],
+    [0.30, 0.35, 0.20, 0.05, 0.05, 0.05],
+    [0.15, 0.30, 0.35, 0.10, 0.05, 0.05],
+    [0.10, 0.25, 0.35, 0.25, 0.00, 0.05],
+    [0.35, 0.25, 0.10, 0.00, 0.25, 0.05],
+    [0.35, 0.25, 0.10, 0.05, 0.00, 0.25],
+])
+register_weather("Forest", [
+    [0.50, 0.20, 0.10, 0.02, 0.13, 0.05],
+    [0.20, 0.35, 0.25, 0.05, 0.10, 0.05],
+    [0.10, 0.25, 0.40, 0.10, 0.10, 0.05],
+    [0.05, 0.20, 0.40, 0.25, 0.05, 0.05],
+    [0.20, 0.20, 0.15, 0.00, 0.40, 0.05],
+    [0.25, 0.25, 0.15, 0.05, 0.05, 0.25],
+])
+register_weather("Cave", [
+    [0.80, 0.10, 0.04, 0.01, 0.03, 0.02],
+    [0.10, 0.75, 0.08, 0.02, 0.03, 0.02],
+    [0.05, 0.10, 0.75, 0.05, 0.03, 0.02],
+    [0.03, 0.07, 0.15, 0.70, 0.03, 0.02],
+    [0.10, 0.05, 0.03, 0.00, 0.80, 0.02],
+    [0.10, 0.05, 0.03, 0.02, 0.00, 0.80],
+])
+register_weather("Mountain", [
+    [0.40, 0.20, 0.05, 0.10, 0.05, 0.20],
+    [0.15, 0.30, 0.15, 0.15, 0.10, 0.15],
+    [0.05, 0.20, 0.30, 0.25, 0.05, 0.15],
+    [0.05, 0.15, 0.20, 0.40, 0.05, 0.15],
+    [0.15, 0.20, 0.10, 0.05, 0.35, 0.15],
+    [0.20, 0.15, 0.05, 0.15, 0.05, 0.40],
+])
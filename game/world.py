@@ -1,68 +1,604 @@
-from locations.cave import explore_cave
-from locations.forest import enter_forest
-from locations.mountain import climb_mountain
-from locations.village import visit_village
+import importlib
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from itertools import islice
+from types import MappingProxyType
 
+from game.plugins import discover_plugins
+from game.state import WorldState, get_world_state, register_event, register_note
+from utils.output import say
+from utils.prompts import follow
+
+
+PATH_CACHE_SIZE = 64
+START_LOCATION = "Village"
+
+# Location type -> its menu. The location modules are only imported once someone interacts there.
+LOCATION_HANDLERS = {}
+_loaded_handlers = {}
+
+
+class LocationGraph:
+    """Integer-indexed adjacency of a world's connections.
+
+    Connections are stored as CSR arrays (offsets into one flat targets array), each
+    location's row sorted so has_edge() is a binary search (see sort_rows()), and
+    breadth-first search trees are cached per source location, so repeated route
+    lookups from the same place cost only the length of the route.
+    """
+
+    def __init__(self, names, offsets, targets, ids=None):
+        self.names = names
+        self.ids = ids if ids is not None else {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self._lowercase = None
+        self._sorted = None
+        self._trees = OrderedDict()
+
+    @classmethod
+    def from_locations(cls, locations):
+        names = list(locations)
+        ids = {name: i for i, name in enumerate(names)}
+        offsets = array("l", [0])
+        targets = array("l")
+        for name in names:
+            targets.extend(sorted(ids[connection] for connection in locations[name]["connections"] if connection in ids))
+            offsets.append(len(targets))
+        return cls(names, offsets, targets, ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    def neighbor_ids(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def neighbors(self, name):
+        return [self.names[i] for i in self.neighbor_ids(self.ids[name])]
+
+    def has_edge(self, source, target):
+        source_id, target_id = self.ids.get(source), self.ids.get(target)
+        if source_id is None or target_id is None:
+            return False
+        end = self.offsets[source_id + 1]
+        index = bisect_left(self.targets, target_id, self.offsets[source_id], end)
+        return index < end and self.targets[index] == target_id
+
+    def find(self, name):
+        """Resolve a location name case-insensitively, or return None."""
+        if name in self.ids:
+            return name
+        if self._lowercase is None:
+            self._lowercase = {known.lower(): known for known in self.names}
+        return self._lowercase.get(name.lower())
+
+    def complete(self, prefix):
+        """The location prefix names exactly or is the only case-insensitive prefix of, or None."""
+        found = self.find(prefix)
+        if found or not prefix:
+            return found
+        if self._sorted is None:
+            self._sorted = sorted(self._lowercase)
+        prefix = prefix.lower()
+        start = bisect_left(self._sorted, prefix)
+        matches = [name for name in self._sorted[start:start + 2] if name.startswith(prefix)]
+        return self._lowercase[matches[0]] if len(matches) == 1 else None
+
+    def _tree(self, source):
+        tree = self._trees.get(source)
+        if tree is not None:
+            self._trees.move_to_end(source)
+            return tree
+        tree = array("l", [-1]) * len(self.names)
+        tree[source] = source
+        queue = deque([source])
+        offsets, targets = self.offsets, self.targets
+        while queue:
+            node = queue.popleft()
+            for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                if tree[neighbor] == -1:
+                    tree[neighbor] = node
+                    queue.append(neighbor)
+        self._trees[source] = tree
+        if len(self._trees) > PATH_CACHE_SIZE:
+            self._trees.popitem(last=False)
+        return tree
+
+    def shortest_path(self, source, target):
+        """Location names from source to target inclusive, or None if unreachable."""
+        source_id, target_id = self.ids[source], self.ids[target]
+        tree = self._tree(source_id)
+        if tree[target_id] == -1:
+            return None
+        path = [target_id]
+        while path[-1] != source_id:
+            path.append(tree[path[-1]])
+        return [self.names[i] for i in reversed(path)]
+
+
+def sort_rows(offsets, targets):
+    """Sort each row of CSR adjacency in place, as LocationGraph.has_edge() expects."""
+    for node in range(len(offsets) - 1):
+        start, end = offsets[node], offsets[node + 1]
+        if end - start > 1:
+            targets[start:end] = array(targets.typecode, sorted(targets[start:end]))
+    return offsets, targets
+
+
+class LocationTable(dict):
+    """A world["locations"] mapping of plain dicts (as in older saves), caching its LocationGraph until locations are added or removed.
+
+    Edit connections through connect_locations()/disconnect_locations() so the cache is dropped.
+    """
+
+    __slots__ = ("_graph", "_changed")
+
+    def mark_changed(self, location):
+        try:
+            self._changed.add(location)
+        except AttributeError:
+            self._changed = {location}
+
+    def take_changed(self):
+        """Names of locations edited, added or removed since the last call."""
+        changed = getattr(self, "_changed", set())
+        self._changed = set()
+        return changed
+
+    def graph(self):
+        try:
+            return self._graph
+        except AttributeError:
+            self._graph = LocationGraph.from_locations(self)
+            return self._graph
+
+    def invalidate(self):
+        try:
+            del self._graph
+        except AttributeError:
+            pass
+
+    def __setitem__(self, key, value):
+        self.invalidate()
+        self.mark_changed(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.invalidate()
+        self.mark_changed(key)
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self.invalidate()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.invalidate()
+        return super().popitem()
+
+    def clear(self):
+        self.invalidate()
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        self.invalidate()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self.invalidate()
+        return super().setdefault(key, default)
+
+
+def freeze_location(entry):
+    """A read-only copy of a location entry, with tuples in place of lists."""
+    return MappingProxyType({key: tuple(value) if isinstance(value, list) else value for key, value in entry.items()})
+
+def thaw_location(entry):
+    """An editable copy of a location entry."""
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in entry.items()}
+
+WORLD_TEMPLATES = {
+    "classic": MappingProxyType({name: freeze_location(entry) for name, entry in {
+        "Village": {
+            "description": "A small, peaceful village with thatched-roof houses and friendly inhabitants.",
+            "connections": ["Forest", "Mountain"],
+            "items": ["map", "bread"]
+        },
+        "Forest": {
+            "description": "A dense, mysterious forest with towering trees and the sound of rustling leaves.",
+            "connections": ["Village", "Cave"],
+            "items": ["stick", "berries"]
+        },
+        "Cave": {
+            "description": "A dark, damp cave with echoing sounds and glittering minerals on the walls.",
+            "connections": ["Forest"],
+            "items": ["torch", "gemstone"]
+        },
+        "Mountain": {
+            "description": "A tall, snow-capped mountain with treacherous paths and breathtaking views.",
+            "connections": ["Village"],
+            "items": ["rope", "pickaxe"]
+        }
+    }.items()}),
+}
+_template_graphs = {}
+_plugins_installed = False
+_plugins_installing = False
+# Reentrant, so a plugin that makes a world while it is being imported gets the template as it is so far.
+_plugins_lock = threading.RLock()
+_UNCHANGED = object()
+
+
+def install_plugins():
+    """Add every location plugin (see game.plugins) to the classic template and register its menu. Runs once.
+
+    Worlds made on other threads meanwhile wait, so none is made from the template without the plugins.
+    A plugin can't replace the game's own locations or location types; those parts of it are skipped.
+    """
+    global _plugins_installed, _plugins_installing
+    if _plugins_installed:
+        return
+    with _plugins_lock:
+        if _plugins_installed or _plugins_installing:
+            return
+        _plugins_installing = True
+        try:
+            _install_plugins()
+        finally:
+            _plugins_installing = False
+            _plugins_installed = True
+
+def _install_plugins():
+    plugins = discover_plugins()
+    if not plugins:
+        return
+    locations = {name: thaw_location(entry) for name, entry in WORLD_TEMPLATES["classic"].items()}
+    for plugin in plugins:
+        if plugin["type"] in LOCATION_HANDLERS:
+            say(f"Skipping location plugin {plugin['module']}: the game already has {plugin['type']} locations.")
+            continue
+        register_location_handler(plugin["type"], plugin["handler"])
+        added = {}
+        for name, entry in plugin["locations"].items():
+            if name in locations:
+                say(f"Skipping location {name} from plugin {plugin['module']}: the game already has one.")
+                continue
+            added[name] = entry
+            locations[name] = {"connections": [], "items": [], "type": plugin["type"], **thaw_location(entry)}
+        for name, entry in added.items():
+            for other in entry.get("connections", ()):
+                if other in locations and name not in locations[other]["connections"]:
+                    locations[other]["connections"].append(name)
+        for name, items in plugin["items"].items():
+            if name in locations:
+                locations[name]["items"].extend(items)
+    WORLD_TEMPLATES["classic"] = MappingProxyType({name: freeze_location(entry) for name, entry in locations.items()})
+    _template_graphs.pop("classic", None)
+
+
+class LocationOverlay(MutableMapping):
+    """A world["locations"] mapping that layers one game's changes over a shared, read-only template.
+
+    Reading a location the game hasn't changed returns the template's frozen entry, so every
+    game started from the same template shares one copy of it (and one LocationGraph until
+    connections change). edit_location() copies an entry into the overlay before it is
+    changed, and only the overlay is saved. A location removed from the template is kept in
+    the overlay as None.
+    """
+
+    __slots__ = ("template_name", "template", "_edits", "_changed", "_graph")
+
+    def __init__(self, template_name):
+        install_plugins()
+        self.template_name = template_name
+        self.template = WORLD_TEMPLATES[template_name]
+        self._edits = {}
+        self._graph = _template_graphs.get(template_name)
+
+    @property
+    def source(self):
+        return {"template": self.template_name}
+
+    def __getitem__(self, location):
+        entry = self._edits.get(location, _UNCHANGED)
+        if entry is _UNCHANGED:
+            return self.template[location]
+        if entry is None:
+            raise KeyError(location)
+        return entry
+
+    def __contains__(self, location):
+        entry = self._edits.get(location, _UNCHANGED)
+        return location in self.template if entry is _UNCHANGED else entry is not None
+
+    def __iter__(self):
+        edits = self._edits
+        for location in self.template:
+            if edits.get(location, _UNCHANGED) is not None:
+                yield location
+        for location, entry in edits.items():
+            if entry is not None and location not in self.template:
+                yield location
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __setitem__(self, location, entry):
+        self._edits[location] = entry
+        self.mark_changed(location)
+        self.invalidate()
+
+    def __delitem__(self, location):
+        if location not in self:
+            raise KeyError(location)
+        if location in self.template:
+            self._edits[location] = None
+        else:
+            del self._edits[location]
+        self.mark_changed(location)
+        self.invalidate()
+
+    def mark_changed(self, location):
+        """Note a location as changed, copying it out of the template so it can be edited in place."""
+        if location not in self._edits and location in self.template:
+            self._edits[location] = thaw_location(self.template[location])
+        try:
+            self._changed.add(location)
+        except AttributeError:
+            self._changed = {location}
+
+    def take_changed(self):
+        """Names of locations edited, added or removed since the last call."""
+        changed = getattr(self, "_changed", set())
+        self._changed = set()
+        return changed
+
+    def graph(self):
+        if self._graph is None:
+            if any(entry is None or entry["connections"] != list(self.template.get(location, {}).get("connections", ()))
+                   for location, entry in self._edits.items()):
+                self._graph = LocationGraph.from_locations(self)
+            else:
+                if self.template_name not in _template_graphs:
+                    _template_graphs[self.template_name] = LocationGraph.from_locations(self.template)
+                self._graph = _template_graphs[self.template_name]
+        return self._graph
+
+    def invalidate(self):
+        self._graph = None
+
+    def edited_entries(self):
+        """The overlay: changed and added locations by name, and None for removed ones."""
+        return dict(self._edits)
+
+    def restore(self, entries):
+        """Put back an overlay saved from edited_entries()."""
+        self._edits.update(entries)
+        self.invalidate()
 
 def initialize_world():
     return {
-        "current_location": "Village",
-        "locations": {
-            "Village": {
-                "description": "A small, peaceful village with thatched-roof houses and friendly inhabitants.",
-                "connections": ["Forest", "Mountain"],
-                "items": ["map", "bread"]
-            },
-            "Forest": {
-                "description": "A dense, mysterious forest with towering trees and the sound of rustling leaves.",
-                "connections": ["Village", "Cave"],
-                "items": ["stick", "berries"]
-            },
-            "Cave": {
-                "description": "A dark, damp cave with echoing sounds and glittering minerals on the walls.",
-                "connections": ["Forest"],
-                "items": ["torch", "gemstone"]
-            },
-            "Mountain": {
-                "description": "A tall, snow-capped mountain with treacherous paths and breathtaking views.",
-                "connections": ["Village"],
-                "items": ["rope", "pickaxe"]
-            }
-        }
+        "current_location": START_LOCATION,
+        "locations": LocationOverlay("classic"),
     }
 
+def get_location_table(world):
+    """world["locations"] as an indexed table; plain location dicts (e.g. from a save) are wrapped on first use."""
+    locations = world["locations"]
+    if not hasattr(locations, "graph"):
+        locations = world["locations"] = LocationTable(locations)
+    return locations
+
+def get_world_graph(world):
+    """The cached LocationGraph for a world. Plain location dicts (e.g. from a save) are indexed on first use."""
+    return get_location_table(world).graph()
+
+def edit_location(world, location):
+    """A location's entry for in-place changes. Changes made through it are picked up by journaled saves."""
+    locations = get_location_table(world)
+    locations.mark_changed(location)
+    return locations[location]
+
+def connect_locations(world, location, other, both_ways=True):
+    edit_location(world, location)["connections"].append(other)
+    if both_ways:
+        edit_location(world, other)["connections"].append(location)
+    world["locations"].invalidate()
+
+def disconnect_locations(world, location, other, both_ways=True):
+    pairs = [(location, other), (other, location)] if both_ways else [(location, other)]
+    for source, target in pairs:
+        connections = edit_location(world, source)["connections"]
+        if target in connections:
+            connections.remove(target)
+    world["locations"].invalidate()
+
+def find_path(world, destination):
+    """The shortest route from the current location to destination, or None if there is none."""
+    graph = get_world_graph(world)
+    destination = graph.find(destination)
+    if destination is None:
+        return None
+    return graph.shortest_path(get_current_location(world), destination)
+
 def get_current_location(world):
     return world["current_location"]
 
 def get_location_description(world, location):
-    return world["locations"][location]["description"]
+    """The location's description, followed by notes for what world events have done to it."""
+    description = world["locations"][location]["description"]
+    if "state" not in world:
+        return description
+    return get_world_state(world).describe(location, description)
 
 def get_available_locations(world):
     current_location = get_current_location(world)
     return world["locations"][current_location]["connections"]
 
 def change_location(world, new_location):
-    if new_location in get_available_locations(world):
+    if is_location_accessible(world, new_location):
         world["current_location"] = new_location
         return True
     return False
 
-def interact_with_location(world, player):
-    current_location = get_current_location(world)
+def get_location_type(world, location):
+    """The kind of place a location is; generated locations carry a "type", the classic four are their own type."""
+    return world["locations"][location].get("type", location)
 
-    if current_location == "Forest":
-        enter_forest(world, player)
-    elif current_location == "Cave":
-        explore_cave(world, player)
-    elif current_location == "Village":
-        visit_village(world, player)
-    elif current_location == "Mountain":
-        climb_mountain(world, player)
-    else:
-        print("There's nothing special to interact with here.")
+def register_location_handler(location_type, handler):
+    """Register a location type's menu: handler(world, player), or a "module:function" path imported on first use."""
+    LOCATION_HANDLERS[location_type] = handler
+    _loaded_handlers.pop(location_type, None)
+
+def get_location_handler(location_type):
+    """The menu for a location type, importing its module the first time it is needed. None if it has none."""
+    handler = _loaded_handlers.get(location_type)
+    if handler is None:
+        handler = LOCATION_HANDLERS.get(location_type)
+        if isinstance(handler, str):
+            module, _, name = handler.partition(":")
+            handler = getattr(importlib.import_module(module), name)
+        if handler is not None:
+            _loaded_handlers[location_type] = handler
+    return handler
+
+def interact_with_location(world, player):
+    """Run the current location's menu. Yields its prompts (see utils.prompts)."""
+    handler = get_location_handler(get_location_type(world, get_current_location(world)))
+    if handler is None:
+        say("There's nothing special to interact with here.")
+        return
+    yield from follow(handler(world, player))
 
 def is_location_accessible(world, location):
-    return location in get_available_locations(world)
+    return get_world_graph(world).has_edge(get_current_location(world), location)
 
 def get_all_locations(world):
     return list(world["locations"].keys())
+
+def repair_world(world):
+    """Drop what a loaded world refers to but this game no longer has, such as the locations of a removed plugin.
+
+    Saved locations whose type no handler is registered for are removed, connections to
+    missing locations are cut, and a player standing somewhere that is gone is moved to
+    START_LOCATION. Only the saved locations are checked; the template's are always whole.
+    Returns warnings describing what was dropped.
+    """
+    install_plugins()
+    locations = get_location_table(world)
+    saved = locations.edited_entries() if hasattr(locations, "edited_entries") else dict(locations)
+    warnings = []
+    for name, entry in saved.items():
+        if entry is not None and "type" in entry and entry["type"] not in LOCATION_HANDLERS and isinstance(locations, MutableMapping):
+            del locations[name]
+            warnings.append(f"Leaving out the {name}: this game has no {entry['type']} locations (was a plugin removed?).")
+    for name in saved:
+        if name in locations:
+            for other in [other for other in locations[name]["connections"] if other not in locations]:
+                disconnect_locations(world, name, other, both_ways=False)
+                warnings.append(f"The way from the {name} to the {other} is gone.")
+    if world["current_location"] not in locations:
+        warnings.append(f"The {world['current_location']} is gone; you find yourself back in the {START_LOCATION}.")
+        world["current_location"] = START_LOCATION
+    return warnings
+
+def serialize_world(world):
+    """The world as plain data for saving.
+
+    Template and generated worlds save only the locations that were touched plus where the
+    layout came from; game.worldgen.restore_world() puts them back together.
+    """
+    serialized = dict(world)
+    if isinstance(world.get("state"), WorldState):
+        serialized["state"] = world["state"].to_dict()
+    locations = world["locations"]
+    if hasattr(locations, "source"):
+        serialized["locations"] = locations.edited_entries()
+        serialized["locations_source"] = locations.source
+    return serialized
+
+
+# World events (see game.state). Each reducer can safely run again on a world that already has its effect.
+
+LOCATION_NOTES = {
+    "lit": "The cave is now well-lit by your torch.",
+    "clearing": "A trail through the undergrowth leads to a quiet clearing.",
+    "hidden_path": "Cut vines reveal a hidden path.",
+    "storm": "Dark clouds are gathering overhead.",
+    "hidden_cave": "You know of a hidden cave nearby.",
+}
+CLEARING = {
+    "description": "A quiet clearing with a small pond, ringed by wildflowers.",
+    "connections": [],
+    "items": [],
+}
+HIDDEN_CAVE = {
+    "description": "A narrow cave, hidden from casual eyes, with strange runes carved at its mouth.",
+    "connections": [],
+    "items": ["ancient_coin"],
+    "type": "Cave",
+}
+MAP_LIMIT = 20
+
+def _link_new_location(world, location, name, entry):
+    """Add a location reached from location. Generated worlds have a fixed set of locations and are left alone."""
+    locations = get_location_table(world)
+    if name not in locations:
+        if not isinstance(locations, MutableMapping):
+            return
+        locations[name] = thaw_location(entry)
+    if name not in locations[location]["connections"]:
+        connect_locations(world, location, name)
+
+def _add_clearing(world, state, location):
+    _link_new_location(world, location, "Clearing", CLEARING)
+    state.add_location_flag(location, "clearing")
+
+def _reveal_hidden_path(world, state, location, to):
+    locations = get_location_table(world)
+    if isinstance(locations, MutableMapping) and to in locations and to not in locations[location]["connections"]:
+        connect_locations(world, location, to)
+    state.add_location_flag(location, "hidden_path")
+
+def _reveal_hidden_cave(world, state, location):
+    _link_new_location(world, location, "Hidden Cave", HIDDEN_CAVE)
+    state.add_location_flag(location, "hidden_cave")
+
+def _approaching_storm(world, state, location):
+    state.add_location_flag(location, "storm")
+
+def _improve_visibility(world, state, location):
+    state.remove_location_flag(location, "storm")
+
+def _light_location(world, state, location):
+    state.add_location_flag(location, "lit")
+
+def _reveal_map(world, state):
+    state.set_flag("map_revealed")
+
+for flag, note in LOCATION_NOTES.items():
+    register_note(flag, note)
+
+register_event("add_clearing", _add_clearing)
+register_event("reveal_hidden_path", _reveal_hidden_path)
+register_event("reveal_hidden_cave", _reveal_hidden_cave)
+register_event("approaching_storm", _approaching_storm)
+register_event("improve_visibility", _improve_visibility)
+register_event("light_location", _light_location)
+register_event("reveal_map", _reveal_map)
+
+def get_map(world):
+    """(location, connections) pairs the player's map shows: every location once the map is revealed, else just here."""
+    if "state" in world and get_world_state(world).flag("map_revealed"):
+        names = islice(world["locations"], MAP_LIMIT)
+    else:
+        names = [get_current_location(world)]
+    return [(name, world["locations"][name]["connections"]) for name in names]
+
+register_location_handler("Cave", "locations.cave:explore_cave")
+register_location_handler("Forest", "locations.forest:enter_forest")
+register_location_handler("Mountain", "locations.mountain:climb_mountain")
+register_location_handler("Village", "locations.village:visit_village")
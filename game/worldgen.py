@@ -0,0 +1,363 @@
+"""Seeded procedural worlds for scale and stress testing.
+
+Generated worlds use the same schema as initialize_world(): the classic Village, Forest,
+Cave and Mountain come first, followed by numbered locations of those four types. Build
+and save one from the repository root with
+``python -m game.worldgen --size 1000000 --output big.world``, then play it with
+``python main.py big.world``.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+from collections.abc import Mapping
+
+from game.world import LocationGraph, LocationOverlay, sort_rows
+
+LOCATION_TYPES = ["Village", "Forest", "Cave", "Mountain"]
+TYPE_WEIGHTS = [10, 40, 20, 30]
+CLASSIC_CONNECTIONS = [(0, 1), (0, 3), (1, 2)]
+CLASSIC_ITEMS = [["map", "bread"], ["stick", "berries"], ["torch", "gemstone"], ["rope", "pickaxe"]]
+
+# The first description of each type is the one the classic location uses.
+DESCRIPTIONS = {
+    "Village": [
+        "A small, peaceful village with thatched-roof houses and friendly inhabitants.",
+        "A sleepy hamlet where smoke curls from a handful of chimneys.",
+        "A market town bustling with traders calling out their wares.",
+    ],
+    "Forest": [
+        "A dense, mysterious forest with towering trees and the sound of rustling leaves.",
+        "A quiet birch grove where shafts of sunlight reach the mossy floor.",
+        "A tangled thicket of brambles and old, gnarled oaks.",
+    ],
+    "Cave": [
+        "A dark, damp cave with echoing sounds and glittering minerals on the walls.",
+        "A narrow tunnel that smells of wet stone and old smoke.",
+        "A vast cavern where stalactites hang like frozen spears.",
+    ],
+    "Mountain": [
+        "A tall, snow-capped mountain with treacherous paths and breathtaking views.",
+        "A windswept ridge of loose scree and hardy alpine flowers.",
+        "A rocky pass between two peaks, marked by a weathered cairn.",
+    ],
+}
+ITEM_POOLS = {
+    "Village": ["map", "bread"],
+    "Forest": ["stick", "berries", "mushrooms"],
+    "Cave": ["torch", "gemstone"],
+    "Mountain": ["rope", "pickaxe", "mountain_herbs"],
+}
+ITEM_NAMES = sorted({item for pool in ITEM_POOLS.values() for item in pool})
+ITEM_CODES = {item: code for code, item in enumerate(ITEM_NAMES)}
+ARRAYS = ("kinds", "templates", "offsets", "targets", "item_offsets", "item_codes")
+WORLD_FILE_MAGIC = b"KAGW"
+WORLD_FILE_VERSION = 2  # version 1 files may have unsorted connection rows
+
+
+class CompactLocations(Mapping):
+    """A world["locations"] mapping backed by flat arrays instead of one dict per location.
+
+    Names are derived from a location's type and index ("Forest 1234") rather than stored,
+    descriptions are shared templates, and connections and items are CSR arrays. A location
+    becomes a real dict the first time it is looked up, so edits to it persist; untouched
+    locations cost a few bytes each.
+    """
+
+    def __init__(self, kinds, templates, offsets, targets, item_offsets, item_codes, source=None):
+        self.source = source
+        self.kinds = kinds
+        self.templates = templates
+        self.offsets = offsets
+        self.targets = targets
+        self.item_offsets = item_offsets
+        self.item_codes = item_codes
+        self._entries = {}
+        self._changed = set()
+        self._graph = None
+        self._connections_edited = False
+
+    def name(self, node):
+        if node < len(LOCATION_TYPES):
+            return LOCATION_TYPES[node]
+        return f"{LOCATION_TYPES[self.kinds[node]]} {node}"
+
+    def id(self, name, ignore_case=False):
+        """The index of a location name, or None if there is no such location."""
+        location_type, _, number = name.rpartition(" ")
+        if not location_type:
+            location_type, number = name, ""
+        if ignore_case:
+            location_type = location_type.capitalize()
+        if location_type not in LOCATION_TYPES:
+            return None
+        if not number:
+            return LOCATION_TYPES.index(location_type)
+        if not number.isdigit():
+            return None
+        node = int(number)
+        if len(LOCATION_TYPES) <= node < len(self.kinds) and LOCATION_TYPES[self.kinds[node]] == location_type:
+            return node
+        return None
+
+    def _build(self, node):
+        location_type = LOCATION_TYPES[self.kinds[node]]
+        return {
+            "description": DESCRIPTIONS[location_type][self.templates[node]],
+            "connections": [self.name(i) for i in self.targets[self.offsets[node]:self.offsets[node + 1]]],
+            "items": [ITEM_NAMES[code] for code in self.item_codes[self.item_offsets[node]:self.item_offsets[node + 1]]],
+            "type": location_type,
+        }
+
+    def __getitem__(self, name):
+        node = self.id(name)
+        if node is None:
+            raise KeyError(name)
+        entry = self._entries.get(node)
+        if entry is None:
+            entry = self._entries[node] = self._build(node)
+        return entry
+
+    def __contains__(self, name):
+        return isinstance(name, str) and self.id(name) is not None
+
+    def __iter__(self):
+        return (self.name(node) for node in range(len(self.kinds)))
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def mark_changed(self, location):
+        self._changed.add(location)
+
+    def take_changed(self):
+        """Names of locations edited since the last call."""
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def graph(self):
+        if self._graph is None:
+            offsets, targets = self.offsets, self.targets
+            if self._connections_edited:
+                offsets, targets = self._merged_adjacency()
+            self._graph = CompactLocationGraph(self, offsets, targets)
+        return self._graph
+
+    def invalidate(self):
+        self._graph = None
+        self._connections_edited = True
+
+    def _merged_adjacency(self):
+        offsets = array("i", [0])
+        targets = array("i")
+        for node in range(len(self.kinds)):
+            entry = self._entries.get(node)
+            if entry is None:
+                targets.extend(self.targets[self.offsets[node]:self.offsets[node + 1]])
+            else:
+                targets.extend(sorted(self.id(name) for name in entry["connections"] if name in self))
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def edited_entries(self):
+        """The locations that have been looked up (and so possibly changed), by name."""
+        return {self.name(node): entry for node, entry in self._entries.items()}
+
+    def restore(self, entries):
+        """Put back saved entries from edited_entries()."""
+        for name, entry in entries.items():
+            node = self.id(name)
+            if node is not None:
+                self._entries[node] = entry
+
+    def nbytes(self):
+        return sum(getattr(self, name).itemsize * len(getattr(self, name)) for name in ARRAYS)
+
+
+class _CompactNames:
+    def __init__(self, locations):
+        self.locations = locations
+
+    def __getitem__(self, node):
+        return self.locations.name(node)
+
+    def __len__(self):
+        return len(self.locations)
+
+
+class _CompactIds:
+    def __init__(self, locations):
+        self.locations = locations
+
+    def get(self, name, default=None):
+        node = self.locations.id(name)
+        return default if node is None else node
+
+    def __getitem__(self, name):
+        node = self.locations.id(name)
+        if node is None:
+            raise KeyError(name)
+        return node
+
+    def __contains__(self, name):
+        return self.locations.id(name) is not None
+
+
+class CompactLocationGraph(LocationGraph):
+    """A LocationGraph that reads names and adjacency straight from CompactLocations."""
+
+    def __init__(self, locations, offsets, targets):
+        super().__init__(_CompactNames(locations), offsets, targets, _CompactIds(locations))
+        self.locations = locations
+
+    def find(self, name):
+        node = self.locations.id(name, ignore_case=True)
+        return None if node is None else self.locations.name(node)
+
+    def complete(self, prefix):
+        # Generated names are a type and a number, so only whole names are worth completing.
+        return self.find(prefix)
+
+
+def generate_locations(size, seed=0, extra_connections=0.5, item_density=0.3):
+    """Generate CompactLocations with size locations.
+
+    Every location is reachable: each new location links to a random earlier one, and
+    extra_connections * size further links are added between random pairs.
+    """
+    if size < len(LOCATION_TYPES):
+        raise ValueError(f"A generated world needs at least {len(LOCATION_TYPES)} locations.")
+    rng = random.Random(seed)
+    extra = size - len(LOCATION_TYPES)
+    kinds = array("B", range(len(LOCATION_TYPES)))
+    kinds.extend(rng.choices(range(len(LOCATION_TYPES)), weights=TYPE_WEIGHTS, k=extra))
+    templates = array("B", [0] * len(LOCATION_TYPES))
+    templates.extend(rng.choices(range(len(DESCRIPTIONS["Village"])), k=extra))
+
+    parents = array("i", [-1]) * size
+    sources = array("i", [a for a, _ in CLASSIC_CONNECTIONS])
+    destinations = array("i", [b for _, b in CLASSIC_CONNECTIONS])
+    for node in range(len(LOCATION_TYPES), size):
+        parents[node] = rng.randrange(node)
+        sources.append(node)
+        destinations.append(parents[node])
+    seen = set()
+    for _ in range(int(size * extra_connections)):
+        a, b = rng.randrange(size), rng.randrange(size)
+        low, high = min(a, b), max(a, b)
+        if low == high or parents[high] == low or low * size + high in seen:
+            continue
+        seen.add(low * size + high)
+        sources.append(low)
+        destinations.append(high)
+    del seen
+
+    offsets = array("i", [0]) * (size + 1)
+    for a, b in zip(sources, destinations):
+        offsets[a + 1] += 1
+        offsets[b + 1] += 1
+    for node in range(size):
+        offsets[node + 1] += offsets[node]
+    targets = array("i", [0]) * offsets[size]
+    cursor = offsets[:-1]
+    for a, b in zip(sources, destinations):
+        targets[cursor[a]] = b
+        cursor[a] += 1
+        targets[cursor[b]] = a
+        cursor[b] += 1
+    sort_rows(offsets, targets)
+
+    item_offsets = array("i", [0])
+    item_codes = array("B")
+    for node in range(size):
+        if node < len(LOCATION_TYPES):
+            item_codes.extend(ITEM_CODES[item] for item in CLASSIC_ITEMS[node])
+        elif rng.random() < item_density:
+            pool = ITEM_POOLS[LOCATION_TYPES[kinds[node]]]
+            item_codes.extend(ITEM_CODES[item] for item in rng.sample(pool, rng.randint(1, 2)))
+        item_offsets.append(len(item_codes))
+
+    source = {"generate": {"size": size, "seed": seed, "extra_connections": extra_connections, "item_density": item_density}}
+    return CompactLocations(kinds, templates, offsets, targets, item_offsets, item_codes, source)
+
+def generate_world(size, seed=0, extra_connections=0.5, item_density=0.3):
+    """A world dict like initialize_world()'s, backed by generated CompactLocations."""
+    return {
+        "current_location": "Village",
+        "locations": generate_locations(size, seed, extra_connections, item_density),
+    }
+
+def save_world_file(world, path):
+    """Write a generated world's layout (not game progress) as raw arrays behind a JSON header."""
+    locations = world["locations"]
+    arrays = [getattr(locations, name) for name in ARRAYS]
+    header = json.dumps({
+        "version": WORLD_FILE_VERSION,
+        "current_location": world["current_location"],
+        "arrays": {name: [values.typecode, len(values)] for name, values in zip(ARRAYS, arrays)},
+    }).encode()
+    with open(path, "wb") as world_file:
+        world_file.write(WORLD_FILE_MAGIC)
+        world_file.write(len(header).to_bytes(4, "little"))
+        world_file.write(header)
+        for values in arrays:
+            values.tofile(world_file)
+
+def load_world_file(path):
+    """Load a world written by save_world_file()."""
+    with open(path, "rb") as world_file:
+        if world_file.read(len(WORLD_FILE_MAGIC)) != WORLD_FILE_MAGIC:
+            raise ValueError(f"{path} is not a generated world file.")
+        header = json.loads(world_file.read(int.from_bytes(world_file.read(4), "little")))
+        arrays = []
+        for name in ARRAYS:
+            typecode, length = header["arrays"][name]
+            values = array(typecode)
+            values.fromfile(world_file, length)
+            arrays.append(values)
+    if header.get("version", 1) < 2:
+        sort_rows(arrays[ARRAYS.index("offsets")], arrays[ARRAYS.index("targets")])
+    locations = CompactLocations(*arrays, source={"file": os.path.abspath(path)})
+    return {"current_location": header["current_location"], "locations": locations}
+
+def restore_world(world):
+    """Undo serialize_world() for a template or generated world: rebuild its layout and put the saved locations back."""
+    source = world.pop("locations_source", None)
+    if source is None:
+        return world
+    if "template" in source:
+        locations = LocationOverlay(source["template"])
+    elif "file" in source:
+        locations = load_world_file(source["file"])["locations"]
+    else:
+        locations = generate_locations(**source["generate"])
+    locations.restore(world["locations"])
+    world["locations"] = locations
+    return world
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large procedural world.")
+    parser.add_argument("--size", type=int, default=100_000, help="number of locations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--extra-connections", type=float, default=0.5, help="extra links per location")
+    parser.add_argument("--item-density", type=float, default=0.3, help="share of locations holding items")
+    parser.add_argument("--output", help="write the world to this file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    world = generate_world(args.size, args.seed, args.extra_connections, args.item_density)
+    generated = time.perf_counter()
+    locations = world["locations"]
+    print(f"generated {len(locations)} locations, {len(locations.targets) // 2} connections, "
+          f"{len(locations.item_codes)} items in {generated - start:.2f}s ({locations.nbytes() / 2**20:.1f} MiB)")
+    if args.output:
+        save_world_file(world, args.output)
+        loaded = time.perf_counter()
+        load_world_file(args.output)
+        print(f"saved to {args.output}; loads in {(time.perf_counter() - loaded) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
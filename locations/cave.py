@@ -0,0 +1,58 @@
+from game.player import add_item_to_inventory, damage_player
+from utils.output import say
+from utils.random_events import compile_event_table, generate_random_event
+
+ECHO_EVENTS = compile_event_table([("bats", 30), (None, 70)])
+DARK_CORNER_EVENTS = compile_event_table([("find_coin", 25), (None, 75)])
+
+
+def explore_cave(world, player):
+    say("You step into the cave. Water drips somewhere in the darkness ahead.")
+
+    while True:
+        say("\nWhat would you like to do in the cave?")
+        say("1. Examine the walls")
+        say("2. Follow the echoes")
+        say("3. Search the dark corners")
+        say("4. Leave the cave")
+
+        choice = yield "Enter your choice (1-4): "
+
+        if choice == "1":
+            examine_walls(world, player)
+        elif choice == "2":
+            follow_echoes(world, player)
+        elif choice == "3":
+            search_dark_corners(world, player)
+        elif choice == "4":
+            say("You decide to leave the cave.")
+            break
+        else:
+            say("Invalid choice. Please try again.")
+
+def examine_walls(world, player):
+    say("You run your hands over the cold, damp walls.")
+    if "pickaxe" in player["inventory"]:
+        say("You chip away at a glittering vein with your pickaxe.")
+        add_item_to_inventory(player, "gemstone")
+    else:
+        say("The minerals glitter, but you have nothing to dig them out with.")
+
+def follow_echoes(world, player):
+    say("You follow the echoes deeper into the cave.")
+    if generate_random_event(events = ECHO_EVENTS) == "bats":
+        say("A swarm of bats bursts from the darkness!")
+        damage_player(player, 5)
+    else:
+        say("The echoes fade away, leaving you alone with the sound of dripping water.")
+
+def search_dark_corners(world, player):
+    if "torch" in player["inventory"]:
+        say("Your torch lights up the corners of the cave.")
+        if generate_random_event(events = DARK_CORNER_EVENTS) == "find_coin":
+            say("Something glints between the rocks.")
+            add_item_to_inventory(player, "ancient_coin")
+        else:
+            say("You find nothing but damp rocks.")
+    else:
+        say("It's too dark to search without a torch.")
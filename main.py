@@ -1,50 +1,73 @@
+import sys
+
 from game.actions import perform_action
 from game.player import create_player, get_player_status
 from game.world import get_current_location, initialize_world
-from utils.save_load import list_save_files, load_game, save_game
+from game.worldgen import load_world_file
+from utils.autosave import Autosave
+from utils.output import ask, flush, say
+from utils.prompts import drive
+from utils.save_catalog import format_entry
+from utils.save_load import JOURNAL_EXTENSION, list_saves, load_game, start_journal
 from utils.text_formatting import print_help, print_welcome_message
 
 
-def main():
+def new_world(world_file=None):
+    if world_file:
+        return load_world_file(world_file)
+    return initialize_world()
+
+def main(world_file=None):
     print_welcome_message()
+    journal_name = None
 
     # Add load game option
-    load_option = input("Do you want to load a saved game? (y/n): ").lower()
+    load_option = ask("Do you want to load a saved game? (y/n): ").lower()
     if load_option == 'y':
-        save_files = list_save_files()
-        if save_files:
-            print("Available save files:")
-            for i, file in enumerate(save_files, 1):
-                print(f"{i}. {file}")
-            choice = int(input("Enter the number of the save file to load: "))
-            player, world = load_game(save_files[choice - 1])
+        saves = list_saves()
+        if saves:
+            say("Available save files:")
+            for i, entry in enumerate(saves, 1):
+                say(f"{i}. {format_entry(entry)}")
+            choice = int(ask("Enter the number of the save file to load: "))
+            save_file = saves[choice - 1]["filename"]
+            player, world = load_game(save_file)
             if player is None or world is None:
-                print("Failed to load game. Starting a new game.")
+                say("Failed to load game. Starting a new game.")
                 player = create_player("Kevin")
-                world = initialize_world()
+                world = new_world(world_file)
+            elif save_file.endswith(JOURNAL_EXTENSION):
+                journal_name = save_file
         else:
-            print("No save files found. Starting a new game.")
+            say("No save files found. Starting a new game.")
             player = create_player("Kevin")
-            world = initialize_world()
+            world = new_world(world_file)
     else:
         player = create_player("Kevin")
-        world = initialize_world()
+        world = new_world(world_file)
+
+    journal = start_journal(player, world, journal_name)
+    autosave = Autosave(player, world)
 
     while True:
         current_location = get_current_location(world)
-        print(f"\nYou are in the {current_location}.")
-        print(get_player_status(player))
+        say(f"\nYou are in the {current_location}.")
+        say(get_player_status(player))
 
-        action = input("What would you like to do? ").lower()
+        action = ask("What would you like to do? ").lower()
 
         if action == "quit":
-            save_game(player, world)
-            print("Thanks for playing! Your progress has been saved.")
+            journal.close()
+            autosave.close()
+            say("Thanks for playing! Your progress has been saved.")
+            flush()
             break
         elif action == "help":
             print_help()
         else:
-            perform_action(player, world, action)
+            drive(perform_action(player, world, action))
+            journal.record()
+            autosave.tick()
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,67 @@
+from game.player import damage_player, heal_player
+from game.weather import get_current_weather
+from utils.output import say
+from utils.random_events import compile_event_table, generate_random_event
+
+FISHING_EVENTS = compile_event_table([("catch", 40), (None, 60)])
+SKIPPING_EVENTS = compile_event_table([("record", 10), (None, 90)])
+
+PLUGIN = {
+    "type": "Lake",
+    "handler": "visit_lake",
+    "locations": {
+        "Lake": {
+            "description": "A still, clear lake beyond the forest, its shore lined with smooth stones and reeds.",
+            "connections": ["Forest"],
+            "items": ["mushrooms"],
+        },
+    },
+}
+
+
+def visit_lake(world, player):
+    say("You walk down to the water's edge. Dragonflies skim over the lake.")
+
+    while True:
+        say("\nWhat would you like to do at the lake?")
+        say("1. Skip stones")
+        say("2. Fish from the shore")
+        say("3. Go for a swim")
+        say("4. Leave the lake")
+
+        choice = yield "Enter your choice (1-4): "
+
+        if choice == "1":
+            skip_stones(world, player)
+        elif choice == "2":
+            fish(world, player)
+        elif choice == "3":
+            swim(world, player)
+        elif choice == "4":
+            say("You leave the quiet lake behind.")
+            break
+        else:
+            say("Invalid choice. Please try again.")
+
+def skip_stones(world, player):
+    say("You pick a flat stone and send it skipping across the water.")
+    if generate_random_event(events = SKIPPING_EVENTS) == "record":
+        say("Eleven skips! Surely a record for this lake.")
+    else:
+        say("It skips a few times and sinks with a soft plop.")
+
+def fish(world, player):
+    say("You cast a line made from a reed and a bent pin.")
+    if generate_random_event(events = FISHING_EVENTS) == "catch":
+        say("You catch a small fish and cook it over a fire on the shore.")
+        heal_player(player, 10)
+    else:
+        say("Nothing bites. The fish seem wiser than you.")
+
+def swim(world, player):
+    if get_current_weather(world) == "stormy":
+        say("The storm churns the lake into waves that drag you under before you scramble out.")
+        damage_player(player, 10)
+    else:
+        say("The cool water is refreshing.")
+        heal_player(player, 5)
@@ -0,0 +1,192 @@
+"""A telnet-style server that hosts many games at once on one asyncio event loop.
+
+Each connection plays its own game: a player from create_player() (or that player's most
+recent save) and a world from initialize_world(). Sessions are prompting coroutines (see
+utils.prompts), so nothing blocks while a player thinks, and loading and writing saves run
+in worker threads, so no player waits on another's disk. Every prompt is followed by a
+telnet Go Ahead so clients can tell where a response ends. Run it from the repository root
+with ``python server.py --port 4000`` and connect with ``telnet localhost 4000``.
+"""
+import argparse
+import asyncio
+import copy
+import re
+import sqlite3
+
+from game.actions import perform_action
+from game.player import create_player, get_player_status
+from game.world import get_current_location, initialize_world, install_plugins, serialize_world
+from utils.output import NullSink, say, set_sink
+from utils.prompts import Conversation
+from utils.save_load import LOAD_ERRORS, generate_save_filename, get_catalog, read_save_data, store_save_data
+from utils.text_formatting import print_help, print_welcome_message
+
+MAIN_PROMPT = "What would you like to do? "
+NAME_PROMPT = "What is your name, adventurer? "
+DEFAULT_NAME = "Kevin"
+MAX_NAME_LENGTH = 20
+MAX_CONNECTIONS = 1000
+IDLE_TIMEOUT = 300
+GO_AHEAD = b"\xff\xf9"  # telnet IAC GA
+
+
+def clean_name(text):
+    """A player name that is safe to put in a save filename."""
+    return re.sub(r"[^A-Za-z0-9_]", "", text)[:MAX_NAME_LENGTH] or DEFAULT_NAME
+
+def read_most_recent_save(name):
+    """(player, world, message) for name's most recent save; player and world are None if there is none to load.
+
+    Runs in a worker thread, where say() would reach whichever session is talking, so it reports through message.
+    """
+    filename = get_catalog().most_recent(name)
+    if filename is None:
+        return None, None, "No save files found."
+    warnings = []
+    try:
+        player, world = read_save_data(filename, warnings)
+    except LOAD_ERRORS as e:
+        return None, None, f"Error: The save file {filename} could not be loaded ({e!r})."
+    return player, world, "\n".join([*warnings, f"Game loaded successfully from {filename}"])
+
+
+class GameSession:
+    """One connection's game, run one line of input at a time."""
+
+    def __init__(self):
+        self.player = None
+        self.world = None
+        self.saved = False
+        self._playing = False
+        self._conversation = Conversation(self._ask_name())
+
+    @property
+    def finished(self):
+        return self._playing and self._conversation.finished
+
+    def start(self):
+        """The welcome text and the first prompt."""
+        return self._conversation.start() + self._conversation.prompt
+
+    async def handle(self, line):
+        """Answer the current prompt with line. Returns the text to send back, ending in the next prompt if any."""
+        text = self._conversation.send(line)
+        if not self._playing:
+            # The name is in: load that player's save off the event loop, then start the game.
+            name = self._conversation.result
+            self.player, self.world, message = await asyncio.to_thread(read_most_recent_save, name)
+            self._playing = True
+            self._conversation = Conversation(self._play(name, message))
+            text += self._conversation.start()
+        elif self._conversation.finished and self._conversation.result == "quit":
+            text += await self.save() + "Thanks for playing! Your progress has been saved.\n"
+        return text if self.finished else text + self._conversation.prompt
+
+    def _ask_name(self):
+        print_welcome_message()
+        return clean_name((yield NAME_PROMPT).strip())
+
+    def _play(self, name, message):
+        say(message)
+        if self.player is None:
+            say(f"Welcome, {name}! Starting a new game.")
+            self.player, self.world = create_player(name), initialize_world()
+
+        while True:
+            say(f"\nYou are in the {get_current_location(self.world)}.")
+            say(get_player_status(self.player))
+            action = (yield MAIN_PROMPT).strip().lower()
+            if action == "quit":
+                return "quit"
+            elif action == "help":
+                print_help()
+            else:
+                yield from perform_action(self.player, self.world, action)
+                if self.player["health"] == 0:
+                    return
+
+    async def save(self):
+        """Save the game unless it was already saved or never started. A defeated player's game isn't saved.
+
+        The state is copied here, on the event loop, and written by a worker thread. Returns the text to tell the player.
+        """
+        if self.saved or self.player is None or self.player["health"] == 0:
+            return ""
+        save_data = copy.deepcopy({"player": self.player.to_dict(), "world": serialize_world(self.world)})
+        filename = generate_save_filename(self.player["name"])
+        try:
+            await asyncio.to_thread(store_save_data, filename, save_data)
+        except (OSError, sqlite3.Error) as e:
+            return f"Error saving game: {e}\n"
+        self.saved = True
+        return f"Game saved successfully as {filename}\n"
+
+
+class GameServer:
+    """Accepts connections and runs a GameSession for each, up to max_connections at once."""
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, idle_timeout=IDLE_TIMEOUT):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.sessions = set()
+
+    async def _send(self, writer, text, go_ahead=True):
+        writer.write(text.replace("\n", "\r\n").encode() + (GO_AHEAD if go_ahead else b""))
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        if len(self.sessions) >= self.max_connections:
+            await self._send(writer, "The server is full. Please try again later.\n", go_ahead=False)
+            writer.close()
+            return
+
+        session = GameSession()
+        self.sessions.add(session)
+        try:
+            await self._send(writer, session.start())
+            while not session.finished:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    await self._send(writer, "\nYou have been idle for too long. Your progress has been saved.\n", go_ahead=False)
+                    break
+                if not line:
+                    break
+                # Drop telnet negotiation and other control bytes.
+                text = "".join(char for char in line.decode(errors="ignore") if char.isprintable())
+                response = await session.handle(text)
+                await self._send(writer, response, go_ahead=not session.finished)
+        except (ConnectionError, ValueError):
+            pass  # the client went away, or sent a line longer than the stream limit
+        finally:
+            await session.save()
+            self.sessions.discard(session)
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=self.max_connections)
+        print(f"Serving on {', '.join(str(sock.getsockname()) for sock in server.sockets)} "
+              f"(up to {self.max_connections} players, {self.idle_timeout}s idle timeout)")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many games of Kevin's Adventure Game over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before an idle player is disconnected")
+    args = parser.parse_args(argv)
+
+    # Install plugins now, so a broken one is reported here and not from a save-loading worker thread.
+    install_plugins()
+    # Each session captures its own text; nothing should reach the server's terminal.
+    set_sink(NullSink())
+    try:
+        asyncio.run(GameServer(args.max_connections, args.idle_timeout).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
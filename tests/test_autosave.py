@@ -0,0 +1,46 @@
+"""The autosave writer survives failed writes and skips saves nothing changed.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+import time
+
+import pytest
+
+from game.player import create_player
+from game.world import initialize_world
+from utils import save_load
+from utils.autosave import Autosave
+from utils.output import CaptureSink, using_sink
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    monkeypatch.setattr(save_load, "SAVE_DIRECTORY", str(tmp_path))
+    with using_sink(CaptureSink()) as sink:
+        yield sink
+
+def test_unchanged_game_is_not_saved_again(output):
+    autosave = Autosave(create_player("Ann"), initialize_world())
+    autosave.close()
+    assert autosave.written == 0
+
+def test_failed_write_is_reported_and_writing_goes_on(output, monkeypatch):
+    player = create_player("Ann")
+    autosave = Autosave(player, initialize_world())
+    record, calls = autosave._catalog.record, []
+    def fail_once(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise ZeroDivisionError("division by zero")
+        record(*args)
+    monkeypatch.setattr(autosave._catalog, "record", fail_once)
+
+    player["gold"] += 1
+    autosave.snapshot()
+    deadline = time.monotonic() + 5
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    player["gold"] += 1
+    autosave.close()
+    assert autosave.written == 1
+    assert "Error autosaving game: division by zero" in output.getvalue()
@@ -0,0 +1,64 @@
+"""Location plugins add to the classic world without replacing any of it.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from game import world
+from utils.output import CaptureSink, using_sink
+
+POND = {
+    "module": "plugins.pond",
+    "file": None,
+    "type": "Pond",
+    "handler": "plugins.pond:visit_pond",
+    "locations": {
+        "Pond": {"description": "A pond.", "connections": ["Forest"]},
+        "Forest": {"description": "A plugin's own forest.", "connections": []},
+    },
+    "items": {},
+}
+FOREST = dict(POND, module="plugins.woods", type="Forest", locations={"Woods": {"description": "Woods.", "connections": []}})
+
+
+@pytest.fixture
+def install(monkeypatch):
+    """install_plugins() as on a fresh start, finding the given plugins."""
+    monkeypatch.setattr(world, "_plugins_installed", False)
+    monkeypatch.setitem(world.WORLD_TEMPLATES, "classic", world.WORLD_TEMPLATES["classic"])
+    monkeypatch.setattr(world, "_template_graphs", {})
+    monkeypatch.setattr(world, "LOCATION_HANDLERS", dict(world.LOCATION_HANDLERS))
+    monkeypatch.setattr(world, "_loaded_handlers", {})
+
+    def install(plugins, delay=0.0):
+        def discover_plugins():
+            time.sleep(delay)
+            return plugins
+        monkeypatch.setattr(world, "discover_plugins", discover_plugins)
+        with using_sink(CaptureSink()) as sink:
+            world.install_plugins()
+        return sink
+    return install
+
+def test_plugins_cannot_replace_game_locations_or_types(install):
+    forest = world.WORLD_TEMPLATES["classic"]["Forest"]
+    output = install([POND, FOREST])
+    classic = world.WORLD_TEMPLATES["classic"]
+    assert classic["Forest"]["description"] == forest["description"]
+    assert "Pond" in classic["Forest"]["connections"]
+    assert "Woods" not in classic
+    assert world.LOCATION_HANDLERS["Forest"] == "locations.forest:enter_forest"
+    assert output.lines() == [
+        "Skipping location Forest from plugin plugins.pond: the game already has one.",
+        "Skipping location plugin plugins.woods: the game already has Forest locations.",
+    ]
+
+def test_worlds_made_during_installation_have_the_plugins(install):
+    with ThreadPoolExecutor(4) as pool:
+        pool.submit(install, [POND], 0.2)
+        time.sleep(0.05)
+        worlds = list(pool.map(lambda _: world.initialize_world(), range(8)))
+    assert all("Pond" in made["locations"] for made in worlds)
@@ -0,0 +1,54 @@
+"""Binary saves read back what was written, and damaged ones are refused.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+import pytest
+
+from utils.save_binary import BINARY_EXTENSION, FORMAT_VERSION, HEADER, MAGIC, BinarySave, read_binary_save, write_binary_save
+
+SAVE_DATA = {
+    "player": {"name": "Ann", "health": 80, "inventory": ["rope", "rope", "map"], "location": "Forest", "gold": 42},
+    "world": {
+        "current_location": "Forest",
+        "locations": {
+            "Village": {"description": "A quiet village.", "connections": ["Forest"], "items": []},
+            "Forest": {"description": "A dark forest.", "connections": ["Village"], "items": ["mushrooms"]},
+        },
+    },
+}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / ("Ann" + BINARY_EXTENSION)
+    write_binary_save(str(path), SAVE_DATA)
+    return path
+
+def test_round_trip(path):
+    assert read_binary_save(str(path)) == SAVE_DATA
+
+def test_sections_are_read_on_their_own(path):
+    with BinarySave(str(path)) as save:
+        assert sorted(save.location_names()) == ["Forest", "Village"]
+        assert save.location("Forest") == SAVE_DATA["world"]["locations"]["Forest"]
+        assert save.player() == SAVE_DATA["player"]
+
+def test_bad_magic(path):
+    path.write_bytes(b"JUNK" + path.read_bytes()[len(MAGIC):])
+    with pytest.raises(ValueError, match="not a binary save"):
+        read_binary_save(str(path))
+
+@pytest.mark.parametrize("keep", [0.5, 0.05])
+def test_truncated(path, keep):
+    data = path.read_bytes()
+    path.write_bytes(data[:int(len(data) * keep)])
+    with pytest.raises(ValueError):
+        read_binary_save(str(path))
+
+@pytest.mark.parametrize("version", [0, FORMAT_VERSION + 1])
+def test_unknown_version(path, version):
+    data = path.read_bytes()
+    _, _, count = HEADER.unpack_from(data)
+    path.write_bytes(HEADER.pack(MAGIC, version, count) + data[HEADER.size:])
+    with pytest.raises(ValueError, match="save format"):
+        read_binary_save(str(path))
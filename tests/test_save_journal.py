@@ -0,0 +1,72 @@
+"""Journaled saves load back what was recorded, even after a crash mid-write.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+import pytest
+
+from game.player import add_item_to_inventory, create_player, move_player
+from game.state import update_world_state
+from game.world import change_location, initialize_world, serialize_world
+from utils.output import CaptureSink, using_sink
+from utils.save_journal import SaveJournal, journal_paths, load_journal
+
+
+@pytest.fixture(autouse=True)
+def output():
+    with using_sink(CaptureSink()) as sink:
+        yield sink
+
+def played_game():
+    player, world = create_player("Ann"), initialize_world()
+    add_item_to_inventory(player, "rope")
+    change_location(world, "Forest")
+    move_player(player, "Forest")
+    update_world_state(world, "add_clearing", location="Forest")
+    return player, world
+
+def saved_state(player, world):
+    return player.to_dict(), serialize_world(world)
+
+def cut_last_line(directory):
+    journal_path, _ = journal_paths(directory, "Ann")
+    with open(journal_path, "a") as journal_file:
+        journal_file.write('{"player": {"gold": 99')
+
+
+def test_round_trip(tmp_path):
+    player, world = played_game()
+    journal = SaveJournal(player, world, str(tmp_path), "Ann")
+    player["gold"] += 5
+    journal.record()
+    change_location(world, "Village")
+    move_player(player, "Village")
+    update_world_state(world, "light_location", location="Cave")
+    journal.record()
+    journal.close()
+    assert saved_state(*load_journal(str(tmp_path), "Ann")) == saved_state(player, world)
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    player, world = played_game()
+    journal = SaveJournal(player, world, str(tmp_path), "Ann")
+    player["gold"] += 5
+    journal.record()
+    journal.close()
+    cut_last_line(str(tmp_path))
+    assert saved_state(*load_journal(str(tmp_path), "Ann")) == saved_state(player, world)
+
+def test_resuming_after_a_truncated_line_keeps_new_turns(tmp_path):
+    player, world = played_game()
+    journal = SaveJournal(player, world, str(tmp_path), "Ann")
+    player["gold"] = 1
+    journal.record()
+    journal.close()
+    cut_last_line(str(tmp_path))
+
+    player, world = load_journal(str(tmp_path), "Ann")
+    journal = SaveJournal(player, world, str(tmp_path), "Ann")
+    assert journal.entries == 1
+    for gold in (50, 60):
+        player["gold"] = gold
+        journal.record()
+    journal.close()
+    assert load_journal(str(tmp_path), "Ann")[0]["gold"] == 60
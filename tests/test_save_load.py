@@ -0,0 +1,118 @@
+"""Saving and loading through utils.save_load, in every format.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from game.player import add_item_to_inventory, create_player, move_player
+from game.state import update_world_state
+from game.world import change_location, get_location_description, initialize_world, serialize_world
+from utils import save_load
+from utils.output import CaptureSink, using_sink
+from utils.save_binary import BINARY_EXTENSION, MAGIC
+from utils.save_store import STORE_EXTENSION
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    """Saves go to a temporary directory, and the game's text to a CaptureSink."""
+    monkeypatch.setattr(save_load, "SAVE_DIRECTORY", str(tmp_path))
+    with using_sink(CaptureSink()) as sink:
+        yield sink
+
+def played_game():
+    player, world = create_player("Ann"), initialize_world()
+    add_item_to_inventory(player, "rope")
+    player["gold"] = 42
+    change_location(world, "Forest")
+    move_player(player, "Forest")
+    update_world_state(world, "add_clearing", location="Forest")
+    update_world_state(world, "reveal_map")
+    return player, world
+
+def saved_state(player, world):
+    return player.to_dict(), serialize_world(world)
+
+
+@pytest.mark.parametrize("extension", [".json", BINARY_EXTENSION, STORE_EXTENSION])
+def test_round_trip(output, extension):
+    player, world = played_game()
+    filename = "Ann" + extension
+    save_load.write_save_data(filename, {"player": player.to_dict(), "world": serialize_world(world)})
+    assert saved_state(*save_load.read_save_data(filename)) == saved_state(player, world)
+
+def test_save_game_is_loaded_back(output):
+    player, world = played_game()
+    save_load.save_game(player, world, BINARY_EXTENSION)
+    loaded = save_load.load_most_recent_save("Ann")
+    assert saved_state(*loaded) == saved_state(player, world)
+    assert "Game loaded successfully" in output.getvalue()
+
+def test_corrupted_binary_save_is_reported(output, tmp_path):
+    player, world = played_game()
+    save_load.write_save_data("Ann" + BINARY_EXTENSION, {"player": player.to_dict(), "world": serialize_world(world)})
+    path = tmp_path / ("Ann" + BINARY_EXTENSION)
+    path.write_bytes(b"JUNK" + path.read_bytes()[len(MAGIC):])
+    assert save_load.load_game(path.name) == (None, None)
+    assert "corrupted" in output.getvalue()
+
+def test_catalog_error_is_reported(output, monkeypatch):
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(save_load.get_catalog(), "record", locked)
+    save_load.save_game(*played_game())
+    assert "Error saving game: database is locked" in output.getvalue()
+
+def test_catalog_is_built_once(output):
+    with ThreadPoolExecutor(8) as pool:
+        catalogs = set(map(id, pool.map(lambda _: save_load.get_catalog(), range(32))))
+    assert len(catalogs) == 1
+
+def test_unknown_events_are_warnings_not_output(output):
+    player, world = played_game()
+    save_data = {"player": player.to_dict(), "world": serialize_world(world)}
+    save_data["world"]["state"]["log"].append(["flood_lake", {}])
+    save_data["world"]["state"]["count"] += 1
+    save_load.write_save_data("Ann.json", save_data)
+    output.clear()
+    warnings = []
+    save_load.read_save_data("Ann.json", warnings)
+    assert output.getvalue() == ""
+    assert warnings == ["Ignoring 1 saved world event(s) this version doesn't know: flood_lake"]
+    save_load.load_game("Ann.json")
+    assert output.lines()[0] == warnings[0]
+
+def test_save_names_are_unique():
+    names = [save_load.generate_save_filename("Kevin") for _ in range(1000)]
+    assert len(set(names)) == len(names)
+
+@pytest.mark.parametrize("extension", [".json", BINARY_EXTENSION])
+def test_concurrent_writes_of_one_save(output, tmp_path, extension):
+    player, world = played_game()
+    save_data = {"player": player.to_dict(), "world": serialize_world(world)}
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: save_load.write_save_data("Kevin" + extension, save_data), range(32)))
+    assert saved_state(*save_load.read_save_data("Kevin" + extension)) == saved_state(player, world)
+    assert [path.name for path in tmp_path.iterdir()] == ["Kevin" + extension]
+
+@pytest.mark.parametrize("pond_saved", [True, False])
+def test_locations_of_a_removed_plugin_are_dropped(output, pond_saved):
+    player, world = played_game()
+    save_data = {"player": player.to_dict(), "world": serialize_world(world)}
+    save_data["player"]["location"] = save_data["world"]["current_location"] = "Pond"
+    locations = save_data["world"]["locations"]
+    locations["Forest"]["connections"].append("Pond")
+    if pond_saved:
+        locations["Pond"] = {"description": "A pond.", "connections": ["Forest"], "items": [], "type": "Pond"}
+    save_load.write_save_data("Ann.json", save_data)
+
+    warnings = []
+    player, world = save_load.read_save_data("Ann.json", warnings)
+    assert world["current_location"] == player["location"] == "Village"
+    assert "Pond" not in world["locations"]
+    assert "Pond" not in world["locations"]["Forest"]["connections"]
+    assert any("Pond is gone" in warning for warning in warnings)
+    assert get_location_description(world, "Village")
@@ -0,0 +1,65 @@
+"""The chunk store shares chunks between saves, and collects only chunks nothing can still need.
+
+Run from the repository root with ``python -m pytest tests``.
+"""
+import os
+import time
+
+from utils.save_store import CHUNK_DIRECTORY, chunk_path, collect_garbage, put_chunk, read_store_save, write_store_save
+
+SAVE_DATA = {
+    "player": {"name": "Ann", "health": 80, "inventory": ["rope"], "location": "Forest", "gold": 42},
+    "world": {
+        "current_location": "Forest",
+        "locations": {
+            "Village": {"description": "A quiet village.", "connections": ["Forest"], "items": []},
+            "Forest": {"description": "A dark forest.", "connections": ["Village"], "items": ["mushrooms"]},
+        },
+    },
+}
+
+
+def chunk_files(directory):
+    return sorted(path for root, _, filenames in os.walk(os.path.join(directory, CHUNK_DIRECTORY))
+                  for path in (os.path.join(root, filename) for filename in filenames))
+
+def age(paths, seconds):
+    for path in paths:
+        past = time.time() - seconds
+        os.utime(path, (past, past))
+
+
+def test_round_trip_shares_chunks(tmp_path):
+    write_store_save(str(tmp_path), "a.manifest", SAVE_DATA)
+    chunks = chunk_files(str(tmp_path))
+    write_store_save(str(tmp_path), "b.manifest", SAVE_DATA, compression="lzma")
+    assert chunk_files(str(tmp_path)) == chunks
+    assert read_store_save(str(tmp_path), "b.manifest") == SAVE_DATA
+
+def test_damaged_chunk_is_rewritten(tmp_path):
+    digest = put_chunk(str(tmp_path), {"gold": 42})
+    with open(chunk_path(str(tmp_path), digest), "wb") as chunk_file:
+        chunk_file.write(b"z garbage")
+    assert put_chunk(str(tmp_path), {"gold": 42}) == digest
+    write_store_save(str(tmp_path), "a.manifest", SAVE_DATA)
+    assert read_store_save(str(tmp_path), "a.manifest") == SAVE_DATA
+
+def test_garbage_collection_keeps_referenced_and_recent_chunks(tmp_path):
+    write_store_save(str(tmp_path), "a.manifest", SAVE_DATA)
+    referenced = chunk_files(str(tmp_path))
+    unreferenced = chunk_path(str(tmp_path), put_chunk(str(tmp_path), {"orphan": True}))
+    in_flight = os.path.join(os.path.dirname(unreferenced), "chunk.tmp")
+    open(in_flight, "wb").close()
+    age(referenced, 7200)
+
+    assert collect_garbage(str(tmp_path)) == (0, 0)
+    age([unreferenced, in_flight], 7200)
+    assert collect_garbage(str(tmp_path))[0] == 2
+    assert chunk_files(str(tmp_path)) == referenced
+
+def test_reused_chunk_is_kept_until_its_manifest_is_written(tmp_path):
+    path = chunk_path(str(tmp_path), put_chunk(str(tmp_path), {"gold": 42}))
+    age([path], 7200)
+    put_chunk(str(tmp_path), {"gold": 42})  # a new save reuses it; its manifest isn't written yet
+    assert collect_garbage(str(tmp_path)) == (0, 0)
+    assert os.path.exists(path)
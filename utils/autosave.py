@@ -0,0 +1,98 @@
+"""Periodic autosaves written by a background thread.
+
+The game thread only copies the current state (a few small dicts, since large generated
+worlds serialize to their edited locations) and hands it over. A writer thread encodes it
+and replaces ``<player>_autosave.json`` atomically. If the game snapshots again before the
+writer gets to the previous one, only the newest snapshot is written. Quitting writes a last
+snapshot only if the game changed since the one before. A failed write is reported on the
+game thread at its next turn, and the writer carries on with the next snapshot.
+"""
+import copy
+import threading
+import time
+
+from game.world import serialize_world
+from utils.output import say
+from utils.save_load import ensure_save_directory, get_catalog, write_save_data
+
+AUTOSAVE_TURNS = 10
+AUTOSAVE_SECONDS = 60
+
+
+class Autosave:
+    """Autosaves a game every `turns` turns or `seconds` seconds, whichever comes first."""
+
+    def __init__(self, player, world, turns=AUTOSAVE_TURNS, seconds=AUTOSAVE_SECONDS, extension=".json"):
+        self.player = player
+        self.world = world
+        self.turns = turns
+        self.seconds = seconds
+        self.filename = f"{player['name']}_autosave{extension}"
+        self.written = 0
+        self._turns_since_save = 0
+        self._last_save = time.monotonic()
+        self._pending = None
+        self._error = None
+        self._saved = self._capture()
+        self._closing = False
+        self._condition = threading.Condition()
+
+        ensure_save_directory()
+        self._catalog = get_catalog()
+        self._writer = threading.Thread(target=self._write_loop, name="autosave", daemon=True)
+        self._writer.start()
+
+    def tick(self):
+        """Count a turn, and snapshot the game if an autosave is due."""
+        self._report_error()
+        self._turns_since_save += 1
+        if self._turns_since_save >= self.turns or time.monotonic() - self._last_save >= self.seconds:
+            self.snapshot()
+
+    def _capture(self):
+        return copy.deepcopy({"player": self.player.to_dict(), "world": serialize_world(self.world)})
+
+    def snapshot(self, save_data=None):
+        """Copy the current state and queue it for the writer, replacing any snapshot still waiting."""
+        save_data = save_data or self._capture()
+        self._saved = save_data
+        with self._condition:
+            self._pending = save_data
+            self._condition.notify()
+        self._turns_since_save = 0
+        self._last_save = time.monotonic()
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing:
+                    self._condition.wait()
+                save_data, self._pending = self._pending, None
+            if save_data is None:
+                return
+            try:
+                write_save_data(self.filename, save_data)
+                self._catalog.record(self.filename, save_data["player"], save_data["world"])
+                self.written += 1
+            except Exception as e:
+                # Keep the writer alive, since the next snapshot may well succeed, and leave the
+                # error for the game thread: say() isn't safe to call from here.
+                with self._condition:
+                    self._error = e
+
+    def _report_error(self):
+        with self._condition:
+            error, self._error = self._error, None
+        if error is not None:
+            say(f"Error autosaving game: {error}")
+
+    def close(self):
+        """Write the current state, unless it is what the last autosave already holds, and wait for the writer to finish."""
+        save_data = self._capture()
+        if save_data != self._saved:
+            self.snapshot(save_data)
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._writer.join()
+        self._report_error()
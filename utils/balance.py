@@ -0,0 +1,204 @@
+"""Vectorized Monte Carlo balance analysis of items and random events.
+
+Outcome weights are read from the compiled EventTables the game itself rolls, so the
+analysis follows any change to them. Requires NumPy. Run from the repository root with
+``python -m utils.balance --rolls 1000000``.
+"""
+import argparse
+
+import numpy as np
+
+from game.items import ANCIENT_ARTIFACT_EVENTS, BERRIES_EVENTS, MUSHROOMS_EVENTS
+from game.player import MAX_HEALTH
+from utils.random_events import (
+    ANIMAL_DAMAGE,
+    BANDIT_THEFT,
+    DISCOVERY_TABLE,
+    ENCOUNTER_TABLE,
+    LOST_CHILD_REWARD,
+    POTION_PRICE,
+    RANDOM_EVENT_TABLE,
+    SPRING_HEAL,
+    TRAP_DAMAGE,
+    TRAVELER_HEAL,
+    TREASURE_TABLE,
+    TREASURE_VALUES,
+)
+
+# item -> (event table or None, health change per outcome or flat health change, consumed)
+ITEM_EFFECTS = {
+    "bread": (None, 20, True),
+    "berries": (BERRIES_EVENTS, {"heal": 10, "poison": -5}, True),
+    "mushrooms": (MUSHROOMS_EVENTS, {"heal": 20, "poison": -10}, True),
+    "mountain_herbs": (None, 30, True),
+    "hermit's_blessing": (None, 50, True),
+    "ancient_artifact": (ANCIENT_ARTIFACT_EVENTS, {"curse": -10}, False),
+}
+
+
+def draw(table, rolls, rng):
+    """Draw outcome indices from an EventTable in one vectorized call."""
+    return rng.choice(len(table.outcomes), size=rolls, p=table.probabilities)
+
+def outcome_values(table, values, default=0):
+    """Encode a per-outcome value mapping as an array aligned with table.outcomes."""
+    return np.array([values.get(outcome, default) for outcome in table.outcomes])
+
+def clamped_change(health, change):
+    """Health actually gained or lost once heal_player/damage_player clamp to 0-100."""
+    return np.clip(health + change, 0, MAX_HEALTH) - health
+
+def distribution(values):
+    """Summary statistics of a sample array."""
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
+        "max": float(values.max()),
+    }
+
+def frequencies(table, indices):
+    """Observed frequency of each outcome."""
+    counts = np.bincount(indices, minlength=len(table.outcomes))
+    return {str(outcome): count / len(indices) for outcome, count in zip(table.outcomes, counts)}
+
+def report(health, gold, items, outcomes=None):
+    result = {
+        "health": distribution(health),
+        "gold": distribution(gold),
+        "items": distribution(items),
+    }
+    if outcomes is not None:
+        result["outcomes"] = outcomes
+    return result
+
+
+def analyze_item(item, rolls, health=MAX_HEALTH, rng=None):
+    """Distribution of the changes caused by using an item once, as in use_item()."""
+    rng = rng or np.random.default_rng()
+    table, effect, consumed = ITEM_EFFECTS[item]
+    if table is None:
+        change = np.full(rolls, effect)
+        outcomes = None
+    else:
+        indices = draw(table, rolls, rng)
+        change = outcome_values(table, effect)[indices]
+        outcomes = frequencies(table, indices)
+    items = np.full(rolls, -1 if consumed else 0)
+    return report(clamped_change(health, change), np.zeros(rolls), items, outcomes)
+
+def encounter_effects(indices, health, gold, has_sword=False, buy_potion=True):
+    """Vectorized handle_random_encounter(): (health, gold, item) changes per roll."""
+    encounter = np.array(ENCOUNTER_TABLE.outcomes, dtype=object)[indices]
+    health_change = np.where(encounter == "friendly_traveler", TRAVELER_HEAL, 0)
+    health_change = np.where(encounter == "wild_animal", -ANIMAL_DAMAGE, health_change)
+    health_change = clamped_change(health, health_change)
+
+    buys = (encounter == "merchant") & buy_potion & (gold >= POTION_PRICE)
+    robbed = (encounter == "bandit") & (not has_sword)
+    gold_change = np.where(encounter == "lost_child", LOST_CHILD_REWARD, 0)
+    gold_change = np.where(buys, -POTION_PRICE, gold_change)
+    gold_change = np.where(robbed, -np.minimum(gold, BANDIT_THEFT), gold_change)
+    return health_change, gold_change, buys.astype(int)
+
+def analyze_encounters(rolls, health=MAX_HEALTH, gold=100, has_sword=False, buy_potion=True, rng=None):
+    """Distribution of one handle_random_encounter() roll."""
+    rng = rng or np.random.default_rng()
+    indices = draw(ENCOUNTER_TABLE, rolls, rng)
+    health_change, gold_change, items = encounter_effects(indices, health, gold, has_sword, buy_potion)
+    return report(health_change, gold_change, items, frequencies(ENCOUNTER_TABLE, indices))
+
+def analyze_traps(rolls, health=MAX_HEALTH, rng=None):
+    """Distribution of one trap_event() roll."""
+    rng = rng or np.random.default_rng()
+    damage = rng.integers(TRAP_DAMAGE[0], TRAP_DAMAGE[1] + 1, size=rolls)
+    return report(clamped_change(health, -damage), np.zeros(rolls), np.zeros(rolls))
+
+def analyze_treasure(rolls, rng=None):
+    """Distribution of one find_treasure() roll."""
+    rng = rng or np.random.default_rng()
+    indices = draw(TREASURE_TABLE, rolls, rng)
+    gold = outcome_values(TREASURE_TABLE, TREASURE_VALUES)[indices]
+    return report(np.zeros(rolls), gold, np.ones(rolls), frequencies(TREASURE_TABLE, indices))
+
+def simulate_turns(turns, runs, health=MAX_HEALTH, gold=100, has_sword=False, buy_potion=True, rng=None):
+    """Apply apply_random_event() once per turn to many players at once.
+
+    Returns the end-of-run distributions plus the death rate and the gold lost to bandits.
+    """
+    rng = rng or np.random.default_rng()
+    health = np.full(runs, health)
+    gold = np.full(runs, gold)
+    items = np.zeros(runs, dtype=int)
+    bandit_losses = np.zeros(runs, dtype=int)
+
+    treasure_values = outcome_values(TREASURE_TABLE, TREASURE_VALUES)
+    discovery_items = outcome_values(DISCOVERY_TABLE, {"ancient_ruins": 1, "abandoned_camp": 1})
+    discovery_health = outcome_values(DISCOVERY_TABLE, {"magical_spring": SPRING_HEAL})
+    bandit = ENCOUNTER_TABLE.outcomes.index("bandit")
+    event_names = np.array(RANDOM_EVENT_TABLE.outcomes, dtype=object)
+
+    for _ in range(turns):
+        alive = health > 0
+        event = event_names[draw(RANDOM_EVENT_TABLE, runs, rng)]
+
+        treasure = (event == "find_item") & alive
+        found = treasure_values[draw(TREASURE_TABLE, runs, rng)]
+        gold = gold + np.where(treasure, found, 0)
+        items = items + treasure
+
+        encounter = (event == "encounter") & alive
+        indices = draw(ENCOUNTER_TABLE, runs, rng)
+        health_change, gold_change, bought = encounter_effects(indices, health, gold, has_sword, buy_potion)
+        health = health + np.where(encounter, health_change, 0)
+        gold = gold + np.where(encounter, gold_change, 0)
+        items = items + np.where(encounter, bought, 0)
+        bandit_losses = bandit_losses - np.where(encounter & (indices == bandit), gold_change, 0)
+
+        trap = (event == "trap") & alive
+        damage = rng.integers(TRAP_DAMAGE[0], TRAP_DAMAGE[1] + 1, size=runs)
+        health = health + np.where(trap, clamped_change(health, -damage), 0)
+
+        discovery = (event == "special_discovery") & alive
+        found = draw(DISCOVERY_TABLE, runs, rng)
+        health = health + np.where(discovery, clamped_change(health, discovery_health[found]), 0)
+        items = items + np.where(discovery, discovery_items[found], 0)
+
+    result = report(health, gold, items)
+    result["death_rate"] = float((health == 0).mean())
+    result["bandit_losses"] = distribution(bandit_losses)
+    return result
+
+
+def print_report(title, result):
+    print(f"\n{title}")
+    for key, value in result.items():
+        if isinstance(value, dict):
+            print(f"  {key}: " + ", ".join(f"{k}={v:.3f}" for k, v in value.items()))
+        else:
+            print(f"  {key}: {value:.4f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo balance report for items and random events.")
+    parser.add_argument("--rolls", type=int, default=1_000_000, help="rolls per outcome table")
+    parser.add_argument("--turns", type=int, default=100, help="turns per run for the per-turn simulation")
+    parser.add_argument("--runs", type=int, default=100_000, help="parallel runs for the per-turn simulation")
+    parser.add_argument("--health", type=int, default=MAX_HEALTH, help="starting health")
+    parser.add_argument("--gold", type=int, default=100, help="starting gold")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+
+    for item in ITEM_EFFECTS:
+        print_report(f"use_item({item})", analyze_item(item, args.rolls, args.health, rng))
+    print_report("handle_random_encounter", analyze_encounters(args.rolls, args.health, args.gold, rng=rng))
+    print_report("trap_event", analyze_traps(args.rolls, args.health, rng))
+    print_report("find_treasure", analyze_treasure(args.rolls, rng))
+    print_report(f"apply_random_event x {args.turns} turns", simulate_turns(args.turns, args.runs, args.health, args.gold, rng=rng))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Load test for server.py: many simultaneous bot players, with command latency percentiles.
+
+Each bot connects, picks a name, plays a fixed number of commands and quits. A command's
+latency runs from sending it to receiving the main prompt again, including any menus or
+encounters it opens along the way, which the bot backs out of. Start a server and run from
+the repository root with ``python -m utils.loadtest --connections 2000 --commands 20``.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from server import GO_AHEAD, MAIN_PROMPT
+
+COMMANDS = ["look", "status", "inventory", "help", "move Forest", "move Village", "move Mountain", "interact", "pickup map", "use bread"]
+
+
+def reply_to(prompt):
+    """An answer that backs out of whatever menu or offer is on screen."""
+    if "(1-" in prompt:
+        return prompt.split("(1-")[1].split(")")[0]  # the last option leaves the menu
+    if "'exit'" in prompt:
+        return "exit"
+    return "n"
+
+async def read_prompt(reader):
+    response = await reader.readuntil(GO_AHEAD)
+    return response[:-len(GO_AHEAD)].decode(errors="replace").rsplit("\n", 1)[-1]
+
+async def play(host, port, name, commands, rng, latencies, timeout):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await asyncio.wait_for(read_prompt(reader), timeout)
+        writer.write(f"{name}\r\n".encode())
+        prompt = await asyncio.wait_for(read_prompt(reader), timeout)
+        for _ in range(commands):
+            started = time.perf_counter()
+            writer.write(f"{rng.choice(COMMANDS)}\r\n".encode())
+            prompt = await asyncio.wait_for(read_prompt(reader), timeout)
+            while prompt != MAIN_PROMPT:
+                writer.write(f"{reply_to(prompt)}\r\n".encode())
+                prompt = await asyncio.wait_for(read_prompt(reader), timeout)
+            latencies.append(time.perf_counter() - started)
+        writer.write(b"quit\r\n")
+        await writer.drain()
+        await reader.read()
+        return True
+    except asyncio.IncompleteReadError:
+        return False  # the server ended the game: the bot was defeated
+    finally:
+        writer.close()
+
+async def run(host, port, bots, commands, seed, timeout):
+    latencies = []
+    results = await asyncio.gather(
+        *(play(host, port, f"bot{i}", commands, random.Random(f"{seed}-{i}"), latencies, timeout) for i in bots),
+        return_exceptions=True,
+    )
+    failures = [type(result).__name__ for result in results if isinstance(result, BaseException)]
+    return latencies, failures, results.count(False)
+
+def _run_share(args):
+    return asyncio.run(run(*args))
+
+def run_load(host, port, connections, commands, seed, timeout, processes=1):
+    """Play connections bots split across processes client processes. Returns (latencies, failures, defeated, seconds)."""
+    shares = [(host, port, range(start, connections, processes), commands, seed, timeout) for start in range(processes)]
+    started = time.perf_counter()
+    if processes == 1:
+        results = [_run_share(shares[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_run_share, shares))
+    elapsed = time.perf_counter() - started
+    latencies = [latency for share, _, _ in results for latency in share]
+    failures = [failure for _, share, _ in results for failure in share]
+    return latencies, failures, sum(defeated for _, _, defeated in results), elapsed
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def print_report(latencies, failures, defeated, elapsed, connections):
+    print(f"{connections - len(failures)}/{connections} sessions completed in {elapsed:.2f}s ({defeated} bots were defeated early)")
+    if latencies:
+        latencies = sorted(latencies)
+        print(f"{len(latencies)} commands, {len(latencies) / elapsed:.0f} commands/s")
+        print(f"latency p50 {percentile(latencies, 0.50) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+              f"max {latencies[-1] * 1000:.2f} ms, mean {statistics.fmean(latencies) * 1000:.2f} ms")
+    kinds = {}
+    for failure in failures:
+        kinds[failure] = kinds.get(failure, 0) + 1
+    for kind, count in sorted(kinds.items()):
+        print(f"{count} sessions failed with {kind}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open many bot connections to server.py and report command latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--commands", type=int, default=20, help="commands per connection before quitting")
+    parser.add_argument("--processes", type=int, default=1, help="client processes to spread the bots over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for any one response")
+    args = parser.parse_args(argv)
+
+    latencies, failures, defeated, elapsed = run_load(args.host, args.port, args.connections, args.commands, args.seed, args.timeout, args.processes)
+    print_report(latencies, failures, defeated, elapsed, args.connections)
+
+if __name__ == "__main__":
+    main()
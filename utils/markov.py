@@ -0,0 +1,150 @@
+"""Exact Markov-chain analysis of survival and gold under apply_random_event().
+
+Each turn the player either rests at the inn (when the policy says so) or rolls
+apply_random_event(). Only health and gold are tracked, so the chain has
+101 x (gold_cap + 1) states and is iterated as a sparse matrix-vector product.
+Requires NumPy. Run from the repository root with ``python -m utils.markov --turns 100``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from game.player import MAX_HEALTH
+from locations.village import INN_HEAL, INN_PRICE
+from utils.random_events import (
+    ANIMAL_DAMAGE,
+    BANDIT_THEFT,
+    DISCOVERY_TABLE,
+    ENCOUNTER_TABLE,
+    LOST_CHILD_REWARD,
+    POTION_PRICE,
+    RANDOM_EVENT_TABLE,
+    SPRING_HEAL,
+    TRAP_DAMAGE,
+    TRAVELER_HEAL,
+    TREASURE_TABLE,
+    TREASURE_VALUES,
+)
+
+
+class MarkovChain:
+    """Sparse transition matrix over (health, gold) states for one play policy."""
+
+    def __init__(self, rest_below=0, has_sword=False, buy_potion=True, gold_cap=500):
+        self.gold_cap = gold_cap
+        self.gold_levels = gold_cap + 1
+        self.size = (MAX_HEALTH + 1) * self.gold_levels
+        health, gold = np.divmod(np.arange(self.size), self.gold_levels)
+        self.health, self.gold = health, gold
+
+        outcomes = []  # (destination health, destination gold, probability) per source state
+
+        def add(new_health, new_gold, probability):
+            outcomes.append((np.broadcast_to(new_health, health.shape), np.broadcast_to(new_gold, gold.shape), np.broadcast_to(probability, health.shape)))
+
+        events = dict(zip(RANDOM_EVENT_TABLE.outcomes, RANDOM_EVENT_TABLE.probabilities))
+        for event in ("nothing", "weather_change"):
+            add(health, gold, events.get(event, 0.0))
+
+        for treasure, chance in zip(TREASURE_TABLE.outcomes, TREASURE_TABLE.probabilities):
+            add(health, gold + TREASURE_VALUES[treasure], events["find_item"] * chance)
+
+        encounters = dict(zip(ENCOUNTER_TABLE.outcomes, ENCOUNTER_TABLE.probabilities))
+        encounter = events["encounter"]
+        add(health + TRAVELER_HEAL, gold, encounter * encounters["friendly_traveler"])
+        buys = (gold >= POTION_PRICE) & buy_potion
+        add(health, np.where(buys, gold - POTION_PRICE, gold), encounter * encounters["merchant"])
+        add(health, gold + LOST_CHILD_REWARD, encounter * encounters["lost_child"])
+        add(health - ANIMAL_DAMAGE, gold, encounter * encounters["wild_animal"])
+        add(health, gold if has_sword else gold - np.minimum(gold, BANDIT_THEFT), encounter * encounters["bandit"])
+
+        damages = range(TRAP_DAMAGE[0], TRAP_DAMAGE[1] + 1)
+        for damage in damages:
+            add(health - damage, gold, events["trap"] / len(damages))
+
+        discoveries = dict(zip(DISCOVERY_TABLE.outcomes, DISCOVERY_TABLE.probabilities))
+        spring = discoveries["magical_spring"]
+        add(health + SPRING_HEAL, gold, events["special_discovery"] * spring)
+        add(health, gold, events["special_discovery"] * (1.0 - spring))
+
+        # Resting replaces the event roll; dead players stay dead.
+        rests = (health > 0) & (health < rest_below) & (gold >= INN_PRICE)
+        dead = health == 0
+        sources, destinations, probabilities = [], [], []
+        for new_health, new_gold, probability in outcomes:
+            new_health = np.where(rests, health + INN_HEAL, new_health)
+            new_gold = np.where(rests, gold - INN_PRICE, new_gold)
+            probability = np.where(rests, 1.0 / len(outcomes), probability)
+            new_health = np.where(dead, 0, new_health)
+            new_gold = np.where(dead, gold, new_gold)
+            sources.append(np.arange(self.size))
+            destinations.append(self.index(np.clip(new_health, 0, MAX_HEALTH), np.clip(new_gold, 0, gold_cap)))
+            probabilities.append(probability)
+
+        # Merge duplicate (source, destination) entries so each step touches every edge once.
+        sources = np.concatenate(sources)
+        destinations = np.concatenate(destinations)
+        edges, inverse = np.unique(sources * self.size + destinations, return_inverse=True)
+        self.probability = np.bincount(inverse, weights=np.concatenate(probabilities))
+        self.source, self.destination = np.divmod(edges, self.size)
+
+    def index(self, health, gold):
+        return health * self.gold_levels + gold
+
+    def initial(self, health=MAX_HEALTH, gold=100):
+        """Distribution concentrated on a single starting state."""
+        distribution = np.zeros(self.size)
+        distribution[self.index(health, min(gold, self.gold_cap))] = 1.0
+        return distribution
+
+    def step(self, distribution):
+        """Advance a state distribution by one turn."""
+        return np.bincount(self.destination, weights=distribution[self.source] * self.probability, minlength=self.size)
+
+    def run(self, turns, health=MAX_HEALTH, gold=100):
+        """Exact outcome after each of turns turns, starting from (health, gold)."""
+        distribution = self.initial(health, gold)
+        survival = []
+        for _ in range(turns):
+            distribution = self.step(distribution)
+            survival.append(1.0 - distribution[:self.gold_levels].sum())  # health == 0 rows come first
+        alive = self.health > 0
+        survived = survival[-1] if survival else 1.0
+        return {
+            "turns": turns,
+            "survival": survived,
+            "survival_by_turn": survival,
+            "expected_gold": float(distribution @ self.gold),
+            "expected_gold_if_alive": float(distribution[alive] @ self.gold[alive] / survived) if survived else 0.0,
+            "expected_health_if_alive": float(distribution[alive] @ self.health[alive] / survived) if survived else 0.0,
+            "gold_cap_mass": float(distribution[self.gold == self.gold_cap].sum()),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact survival and gold analysis of apply_random_event().")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--health", type=int, default=MAX_HEALTH, help="starting health")
+    parser.add_argument("--gold", type=int, default=100, help="starting gold")
+    parser.add_argument("--gold-cap", type=int, default=500, help="gold above this is counted as this")
+    parser.add_argument("--rest-below", type=int, default=0, help="rest at the inn when health is below this")
+    parser.add_argument("--sword", action="store_true", help="the player carries a sword")
+    parser.add_argument("--no-potions", action="store_true", help="never buy the merchant's potion")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    chain = MarkovChain(args.rest_below, args.sword, not args.no_potions, args.gold_cap)
+    built = time.perf_counter()
+    result = chain.run(args.turns, args.health, args.gold)
+    finished = time.perf_counter()
+
+    print(f"states: {chain.size}, transitions: {len(chain.probability)}")
+    print(f"survival after {args.turns} turns: {result['survival']:.6f}")
+    print(f"expected gold: {result['expected_gold']:.3f} (alive: {result['expected_gold_if_alive']:.3f})")
+    print(f"expected health if alive: {result['expected_health_if_alive']:.3f}")
+    print(f"probability mass at the gold cap: {result['gold_cap_mass']:.6f}")
+    print(f"built in {(built - start) * 1000:.1f} ms, iterated in {(finished - built) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Where the game's text goes.
+
+Game code writes through say() (print's signature), never print() directly, and asks the
+player things by yielding prompts (see utils.prompts), which the terminal answers through
+ask(). The active sink decides what happens to the text:
+StreamSink buffers it and writes it to the terminal in one go when the game asks for input
+or the turn ends, NullSink drops it for headless runs, and CaptureSink keeps it for tests.
+"""
+import atexit
+import sys
+from contextlib import contextmanager
+
+
+class StreamSink:
+    """Buffers text and writes it to a stream on flush()."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self._buffer = []
+
+    def write(self, text):
+        self._buffer.append(text)
+
+    def flush(self):
+        if self._buffer:
+            stream = self.stream or sys.stdout
+            stream.write("".join(self._buffer))
+            stream.flush()
+            self._buffer.clear()
+
+
+class NullSink:
+    """Discards everything. While it is active say() returns before formatting anything."""
+
+    silent = True
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+class CaptureSink:
+    """Keeps everything written, for inspecting a game's output."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+    def lines(self):
+        return self.getvalue().splitlines()
+
+    def clear(self):
+        self.parts.clear()
+
+
+_sink = StreamSink()
+_silent = False
+
+def say(*values, sep=" ", end="\n"):
+    """Write a line of game text to the active sink."""
+    if _silent:
+        return
+    _sink.write(sep.join(map(str, values)) + end)
+
+def ask(prompt=""):
+    """Show everything written so far, then read a line from the player."""
+    _sink.flush()
+    return input(prompt)
+
+@atexit.register
+def flush():
+    """Write out anything the active sink is holding."""
+    _sink.flush()
+
+def get_sink():
+    return _sink
+
+def set_sink(sink):
+    """Make sink the active sink. Returns the one it replaces."""
+    global _sink, _silent
+    previous, _sink = _sink, sink
+    _silent = getattr(sink, "silent", False)
+    previous.flush()
+    return previous
+
+@contextmanager
+def using_sink(sink):
+    """Send all game text to sink for the duration of the block."""
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        sink.flush()
+        set_sink(previous)
@@ -0,0 +1,62 @@
+"""Prompts as coroutines.
+
+Game code that needs an answer from the player is a generator: it yields the prompt and
+gets the answer back, as in ``choice = yield "Enter your choice (1-5): "``, and whatever
+calls it uses ``yield from``. Nothing in the game blocks on input itself. drive() plays such
+a generator against a blocking input function such as ask(); Conversation steps it one
+answer at a time, so any number of games can take turns on a single thread.
+"""
+from types import GeneratorType
+
+from utils.output import CaptureSink, ask, using_sink
+
+
+def drive(steps, answer=ask):
+    """Answer each prompt steps yields with answer(prompt) until it finishes. Returns its result."""
+    try:
+        prompt = next(steps)
+        while True:
+            prompt = steps.send(answer(prompt))
+    except StopIteration as stop:
+        return stop.value
+
+def follow(result):
+    """Go through result's prompts if it is a prompting generator. Lets callers mix plain and prompting handlers."""
+    if isinstance(result, GeneratorType):
+        result = yield from result
+    return result
+
+
+class Conversation:
+    """A prompting generator run one answer at a time, with the text it writes captured.
+
+    After each step, prompt is what it is waiting for (None once it has finished) and
+    result is what it returned.
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.prompt = None
+        self.result = None
+        self.finished = False
+        self._output = CaptureSink()
+
+    def start(self):
+        """Run up to the first prompt. Returns the text written on the way."""
+        return self._step(None)
+
+    def send(self, answer):
+        """Answer the current prompt and run up to the next one. Returns the text written on the way."""
+        return self._step(answer)
+
+    def _step(self, answer):
+        with using_sink(self._output):
+            try:
+                self.prompt = self.steps.send(answer)
+            except StopIteration as stop:
+                self.prompt = None
+                self.result = stop.value
+                self.finished = True
+        text = self._output.getvalue()
+        self._output.clear()
+        return text
@@ -1,124 +1,190 @@
 import random
 
 from game.player import add_item_to_inventory, damage_player, heal_player
+from utils.output import say
 
-# from game.world import update_world_state
+from game.state import update_world_state
+from game.weather import change_weather
 from utils.text_formatting import print_event
 
 
+class EventTable:
+    """A weighted event table compiled once into an alias table for O(1) draws."""
+
+    __slots__ = ("outcomes", "weights", "_size", "_threshold", "_alias")
+
+    def __init__(self, events):
+        self.outcomes = tuple(event[0] for event in events)
+        self.weights = tuple(event[1] for event in events)
+        self._size = len(self.outcomes)
+        if not self._size or sum(self.weights) <= 0:
+            raise ValueError("An event table needs at least one positive weight.")
+
+        # Vose's alias method: split every column into the outcome itself and one alias.
+        total = sum(self.weights)
+        scaled = [weight * self._size / total for weight in self.weights]
+        self._threshold = [1.0] * self._size
+        self._alias = list(range(self._size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self._threshold[low] = scaled[low]
+            self._alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+
+    @property
+    def probabilities(self):
+        total = sum(self.weights)
+        return tuple(weight / total for weight in self.weights)
+
+    def sample(self, rng=random):
+        """Draw one outcome."""
+        x = rng.random() * self._size
+        column = int(x)
+        if x - column < self._threshold[column]:
+            return self.outcomes[column]
+        return self.outcomes[self._alias[column]]
+
+    def sample_many(self, count, rng=random):
+        """Draw count outcomes in one call."""
+        outcomes, threshold, alias, size = self.outcomes, self._threshold, self._alias, self._size
+        draws = []
+        for x in (rng.random() * size for _ in range(count)):
+            column = int(x)
+            draws.append(outcomes[column] if x - column < threshold[column] else outcomes[alias[column]])
+        return draws
+
+    def __repr__(self):
+        return f"EventTable({list(zip(self.outcomes, self.weights))!r})"
+
+
+_compiled_tables = {}
+
+def compile_event_table(events):
+    """Return the cached EventTable for a list of (outcome, weight) pairs."""
+    if isinstance(events, EventTable):
+        return events
+    key = tuple((event[0], event[1]) for event in events)
+    table = _compiled_tables.get(key)
+    if table is None:
+        table = _compiled_tables[key] = EventTable(key)
+    return table
+
+def uniform_table(outcomes):
+    """Compile an EventTable in which every outcome is equally likely."""
+    return compile_event_table([(outcome, 1) for outcome in outcomes])
+
+
+ENCOUNTER_TABLE = uniform_table(["friendly_traveler", "merchant", "lost_child", "wild_animal", "bandit"])
+TREASURE_VALUES = {"gold_coin": 5, "silver_necklace": 10, "ancient_artifact": 20, "magic_ring": 30}
+TREASURE_TABLE = uniform_table(TREASURE_VALUES)
+TRAP_TABLE = uniform_table(["pitfall", "snare", "poison_dart"])
+TRAP_DAMAGE = (5, 15)
+TRAVELER_HEAL = 10
+POTION_PRICE = 20
+LOST_CHILD_REWARD = 15
+ANIMAL_DAMAGE = 15
+BANDIT_THEFT = 10
+SPRING_HEAL = 30
+DISCOVERY_TABLE = uniform_table(["hidden_cave", "ancient_ruins", "magical_spring", "abandoned_camp"])
+CAMP_ITEM_TABLE = uniform_table(["rope", "torch", "map"])
+RANDOM_EVENT_TABLE = compile_event_table([("nothing", 20), ("find_item", 20), ("encounter", 20), ("weather_change", 10), ("trap", 10), ("special_discovery", 20)])
+
+
 def generate_random_event(events):
-    """Generate a random event based on probabilities."""
-    return random.choices([event[0] for event in events], weights=[event[1] for event in events])[0]
+    """Generate a random event based on probabilities.
+
+    events may be an EventTable or a list of (outcome, weight) pairs; lists are compiled once and cached.
+    """
+    return compile_event_table(events).sample()
 
 def handle_random_encounter(player, world):
     """Handle a random encounter event. Handled alongside functions like find_treasure(), weather_event(), trap_event(), and special_discovery()"""
-    encounters = [
-        "friendly_traveler",
-        "merchant",
-        "lost_child",
-        "wild_animal",
-        "bandit"
-    ]
-    encounter = random.choice(encounters)
+    encounter = ENCOUNTER_TABLE.sample()
 
     if encounter == "friendly_traveler":
         print_event("You meet a friendly traveler who shares some of their supplies with you.")
-        heal_player(player, 10)
+        heal_player(player, TRAVELER_HEAL)
     elif encounter == "merchant":
         print_event("A wandering merchant offers to sell you a mysterious potion.")
-        if player.get("gold", 0) >= 20:
-            choice = input("Do you want to buy the potion for 20 gold? (y/n): ").lower()
+        if player.get("gold", 0) >= POTION_PRICE:
+            choice = (yield f"Do you want to buy the potion for {POTION_PRICE} gold? (y/n): ").lower()
             if choice == 'y':
-                player["gold"] -= 20
+                player["gold"] -= POTION_PRICE
                 add_item_to_inventory(player, "mysterious_potion")
-                print("You bought the mysterious potion.")
+                say("You bought the mysterious potion.")
             else:
-                print("You decline the offer.")
+                say("You decline the offer.")
         else:
-            print("You don't have enough gold to buy the potion.")
+            say("You don't have enough gold to buy the potion.")
     elif encounter == "lost_child":
         print_event("You find a lost child. After helping them return to their village, the grateful parents reward you.")
-        player["gold"] = player.get("gold", 0) + 15
+        player["gold"] = player.get("gold", 0) + LOST_CHILD_REWARD
     elif encounter == "wild_animal":
         print_event("A wild animal attacks you!")
-        damage_player(player, 15)
+        damage_player(player, ANIMAL_DAMAGE)
     elif encounter == "bandit":
         print_event("A bandit tries to rob you!")
         if "sword" in player["inventory"]:
-            print("You use your sword to fend off the bandit.")
+            say("You use your sword to fend off the bandit.")
         elif player.get("gold", 0) > 0:
-            stolen_gold = min(player["gold"], 10)
+            stolen_gold = min(player["gold"], BANDIT_THEFT)
             player["gold"] -= stolen_gold
-            print(f"The bandit steals {stolen_gold} gold from you.")
+            say(f"The bandit steals {stolen_gold} gold from you.")
         else:
-            print("The bandit finds nothing of value and leaves you alone.")
+            say("The bandit finds nothing of value and leaves you alone.")
 
 def find_treasure(player):
     """Handle finding a treasure."""
-    treasures = [
-        ("gold_coin", 5),
-        ("silver_necklace", 10),
-        ("ancient_artifact", 20),
-        ("magic_ring", 30)
-    ]
-    treasure, value = random.choice(treasures)
+    treasure = TREASURE_TABLE.sample()
+    value = TREASURE_VALUES[treasure]
     print_event(f"You found a {treasure} worth {value} gold!")
     add_item_to_inventory(player, treasure)
     player["gold"] = player.get("gold", 0) + value
 
 def weather_event(world):
     """Handle a weather change event."""
-    weathers = ["sunny", "rainy", "windy", "foggy", "stormy"]
-    new_weather = random.choice(weathers)
+    new_weather = change_weather(world)
     print_event(f"The weather changes to {new_weather}.")
-    # update_world_state(world, f"weather_{new_weather}")
-    # TODO: Implement weather system
-    # change_weather(world, new_weather)
 
 def trap_event(player):
     """Handle a trap event."""
-    traps = ["pitfall", "snare", "poison_dart"]
-    trap = random.choice(traps)
+    trap = TRAP_TABLE.sample()
     print_event(f"You've triggered a {trap} trap!")
-    damage = random.randint(5, 15)
+    damage = random.randint(*TRAP_DAMAGE)
     damage_player(player, damage)
 
 def special_discovery(player, world):
     """Handle a special discovery event."""
-    discoveries = [
-        "hidden_cave",
-        "ancient_ruins",
-        "magical_spring",
-        "abandoned_camp"
-    ]
-    discovery = random.choice(discoveries)
+    discovery = DISCOVERY_TABLE.sample()
     print_event(f"You've discovered a {discovery.replace('_', ' ')}!")
 
     if discovery == "hidden_cave":
-        # update_world_state(world, "add_hidden_cave")
-        print("You mark the location of the hidden cave on your map.")
+        update_world_state(world, "reveal_hidden_cave", location=world["current_location"])
+        say("You mark the location of the hidden cave on your map.")
     elif discovery == "ancient_ruins":
         add_item_to_inventory(player, "ancient_artifact")
-        print("You find an ancient artifact among the ruins.")
+        say("You find an ancient artifact among the ruins.")
     elif discovery == "magical_spring":
-        heal_player(player, 30)
-        print("You drink from the magical spring and feel rejuvenated.")
+        heal_player(player, SPRING_HEAL)
+        say("You drink from the magical spring and feel rejuvenated.")
     elif discovery == "abandoned_camp":
-        items = ["rope", "torch", "map"]
-        found_item = random.choice(items)
+        found_item = CAMP_ITEM_TABLE.sample()
         add_item_to_inventory(player, found_item)
-        print(f"You search the abandoned camp and find a {found_item}.")
+        say(f"You search the abandoned camp and find a {found_item}.")
 
 def apply_random_event(player, world):
-    """Apply a random event to the game state."""
-    event = generate_random_event(events=[("nothing", 20), ("find_item", 20), ("encounter", 20), ("weather_change", 10), ("trap", 10), ("special_discovery", 20)])
+    """Apply a random event to the game state. Yields the merchant's prompt if one turns up."""
+    event = generate_random_event(events=RANDOM_EVENT_TABLE)
 
     if event == "nothing":
         return  # No event occurs
     elif event == "find_item":
         find_treasure(player)
     elif event == "encounter":
-        handle_random_encounter(player, world)
+        yield from handle_random_encounter(player, world)
     elif event == "weather_change":
         weather_event(world)
     elif event == "trap":
@@ -0,0 +1,152 @@
+"""Binary save files with a version header and length-prefixed sections.
+
+Layout (little-endian)::
+
+    b"KAGS"  u16 format version  u32 section count
+    per section: u16 name length, name (UTF-8), u64 offset, u64 length
+    section payloads (compact UTF-8 JSON)
+
+Sections are "player", "world" (every top-level world key except the locations) and one
+"location/<name>" per location, so a reader can memory-map the file and decode only the
+parts it needs. Convert existing JSON saves from the repository root with
+``python -m utils.save_binary saves/*.json``.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+BINARY_EXTENSION = ".ksav"
+MAGIC = b"KAGS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHI")
+NAME_LENGTH = struct.Struct("<H")
+SPAN = struct.Struct("<QQ")
+LOCATION_PREFIX = "location/"
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+def write_binary_save(path, save_data):
+    """Write {"player": ..., "world": ...} as a binary save, replacing path atomically."""
+    world = save_data["world"]
+    sections = [("player", _encode(save_data["player"])),
+                ("world", _encode({key: value for key, value in world.items() if key != "locations"}))]
+    sections.extend((LOCATION_PREFIX + name, _encode(entry)) for name, entry in world["locations"].items())
+
+    names = [name.encode() for name, _ in sections]
+    offset = HEADER.size + sum(NAME_LENGTH.size + len(name) + SPAN.size for name in names)
+    # A temporary file of its own, so two writers of the same save can't interleave.
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as save_file:
+            save_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+            for name, (_, payload) in zip(names, sections):
+                save_file.write(NAME_LENGTH.pack(len(name)) + name + SPAN.pack(offset, len(payload)))
+                offset += len(payload)
+            for _, payload in sections:
+                save_file.write(payload)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+class BinarySave:
+    """A binary save opened with mmap. Only the section table is read up front."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as save_file:
+            self._map = mmap.mmap(save_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_table()
+        except (struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise ValueError(f"{path} is not a valid binary save: {e}") from None
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_table(self):
+        magic, self.version, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a binary save.")
+        if not 1 <= self.version <= FORMAT_VERSION:
+            raise ValueError(f"{self.path} uses save format {self.version}; this game reads formats 1 to {FORMAT_VERSION}.")
+        position = HEADER.size
+        self.sections = {}
+        for _ in range(count):
+            (length,) = NAME_LENGTH.unpack_from(self._map, position)
+            position += NAME_LENGTH.size
+            name = self._map[position:position + length].decode()
+            position += length
+            offset, size = SPAN.unpack_from(self._map, position)
+            position += SPAN.size
+            if offset + size > len(self._map):
+                raise ValueError(f"{self.path} is truncated.")
+            self.sections[name] = (offset, size)
+
+    def section(self, name):
+        """Decode one section."""
+        offset, size = self.sections[name]
+        return json.loads(self._map[offset:offset + size])
+
+    def player(self):
+        return self.section("player")
+
+    def location_names(self):
+        return [name[len(LOCATION_PREFIX):] for name in self.sections if name.startswith(LOCATION_PREFIX)]
+
+    def location(self, name):
+        return self.section(LOCATION_PREFIX + name)
+
+    def world(self):
+        world = self.section("world")
+        world["locations"] = {name: self.location(name) for name in self.location_names()}
+        return world
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_binary_save(path):
+    """Decode a whole binary save into {"player": ..., "world": ...}."""
+    with BinarySave(path) as save:
+        return {"player": save.player(), "world": save.world()}
+
+def convert_json_save(path, remove=False):
+    """Write a binary copy of a JSON save next to it. Returns the new path."""
+    with open(path) as save_file:
+        save_data = json.load(save_file)
+    binary_path = os.path.splitext(path)[0] + BINARY_EXTENSION
+    write_binary_save(binary_path, save_data)
+    if remove:
+        os.remove(path)
+    return binary_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert JSON save files to the binary save format.")
+    parser.add_argument("paths", nargs="+", help="JSON save files to convert")
+    parser.add_argument("--remove", action="store_true", help="delete each JSON save after converting it")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        try:
+            binary_path = convert_json_save(path, args.remove)
+            print(f"{path} -> {binary_path} ({os.path.getsize(binary_path)} bytes)")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error converting {path}: {e}")
+
+if __name__ == "__main__":
+    main()
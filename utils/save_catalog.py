@@ -0,0 +1,128 @@
+"""An SQLite catalog of the save directory.
+
+save_game(), journaled saves and delete_save_file() keep one row per save up to date, so
+listing saves, finding the most recent one and showing their details never scans the
+directory. Rebuild the catalog from the files on disk from the repository root with
+``python -m utils.save_catalog --rebuild``.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from utils.save_journal import JOURNAL_EXTENSION, journal_paths
+
+CATALOG_FILENAME = "catalog.sqlite"
+COLUMNS = ("filename", "player", "saved_at", "location", "health", "gold", "size")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    filename TEXT PRIMARY KEY,
+    player TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    location TEXT,
+    health INTEGER,
+    gold INTEGER,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS saves_by_time ON saves (saved_at);
+CREATE INDEX IF NOT EXISTS saves_by_player ON saves (player, saved_at);
+"""
+INSERT = f"INSERT OR REPLACE INTO saves ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+class SaveCatalog:
+    """Save metadata for one directory. Each call is its own transaction, so it is safe from any thread."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, CATALOG_FILENAME)
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _row(self, filename, player, world, saved_at=None):
+        size = sum(os.path.getsize(path) for path in self._files(filename) if os.path.exists(path))
+        return (filename, player["name"], saved_at or time.time(), world.get("current_location"),
+                player.get("health"), player.get("gold"), size)
+
+    def record(self, filename, player, world, saved_at=None):
+        """Insert or update the row for a save that was just written."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(INSERT, self._row(filename, player, world, saved_at))
+
+    def remove(self, filename):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM saves WHERE filename = ?", (filename,))
+
+    def entries(self):
+        """Every save's metadata as dicts, oldest first."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(f"SELECT {', '.join(COLUMNS)} FROM saves ORDER BY saved_at").fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def filenames(self):
+        with closing(self._connect()) as connection:
+            return [row[0] for row in connection.execute("SELECT filename FROM saves ORDER BY saved_at")]
+
+    def most_recent(self, player=None):
+        """The filename of the newest save, or of the newest save for the named player, or None."""
+        with closing(self._connect()) as connection:
+            if player is None:
+                row = connection.execute("SELECT filename FROM saves ORDER BY saved_at DESC LIMIT 1").fetchone()
+            else:
+                row = connection.execute("SELECT filename FROM saves WHERE player = ? ORDER BY saved_at DESC LIMIT 1", (player,)).fetchone()
+        return row[0] if row else None
+
+    def _files(self, filename):
+        # Journaled saves keep their snapshot beside the journal.
+        if filename.endswith(JOURNAL_EXTENSION):
+            return journal_paths(self.directory, filename)
+        return [os.path.join(self.directory, filename)]
+
+    def rebuild(self, read_save, extensions):
+        """Replace the catalog with rows for every save with one of extensions that read_save(filename) can load.
+
+        Returns the number of saves catalogued.
+        """
+        rows = []
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(extensions):
+                continue
+            try:
+                player, world = read_save(filename)
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            rows.append(self._row(filename, player, world, os.path.getmtime(os.path.join(self.directory, filename))))
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM saves")
+            connection.executemany(INSERT, rows)
+        return len(rows)
+
+
+def format_entry(entry):
+    """One line describing a catalogued save."""
+    saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["saved_at"]))
+    return f"{entry['filename']} - {entry['player']} in the {entry['location']}, health {entry['health']}, gold {entry['gold']} ({saved_at})"
+
+
+def main(argv=None):
+    from utils.save_load import SAVE_DIRECTORY, SAVE_EXTENSIONS, read_save_data
+
+    parser = argparse.ArgumentParser(description="Show or rebuild the save catalog.")
+    parser.add_argument("--directory", default=SAVE_DIRECTORY)
+    parser.add_argument("--rebuild", action="store_true", help="re-read every save file in the directory")
+    args = parser.parse_args(argv)
+
+    catalog = SaveCatalog(args.directory)
+    if args.rebuild:
+        print(f"Catalogued {catalog.rebuild(read_save_data, SAVE_EXTENSIONS)} saves.")
+    for entry in catalog.entries():
+        print(format_entry(entry))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Journaled saves: per-turn deltas appended to a log, compacted into periodic snapshots.
+
+A journaled game is two files in the save directory: ``<name>.snapshot`` holds a full save
+in the usual JSON shape, and ``<name>.journal`` holds one JSON line per turn with only what
+changed since the line before it, including the world events (see game.state) fired that
+turn. Loading reads the snapshot and replays the journal.
+"""
+import copy
+import json
+import os
+from datetime import datetime
+
+from game.player import Player
+from game.state import WorldState
+from game.world import get_location_table, serialize_world
+from game.worldgen import restore_world
+
+JOURNAL_EXTENSION = ".journal"
+SNAPSHOT_EXTENSION = ".snapshot"
+SNAPSHOT_INTERVAL = 100
+# Locations are tracked by the location table and world events by their log, so deltas skip them.
+UNDIFFED_KEYS = ("locations", "state")
+
+
+def journal_paths(directory, name):
+    """(journal path, snapshot path) for a journal name with or without its extension."""
+    if name.endswith(JOURNAL_EXTENSION):
+        name = name[:-len(JOURNAL_EXTENSION)]
+    base = os.path.join(directory, name)
+    return base + JOURNAL_EXTENSION, base + SNAPSHOT_EXTENSION
+
+
+class SaveJournal:
+    """Records one game's turns as deltas against the previous turn."""
+
+    def __init__(self, player, world, directory, name=None, snapshot_interval=SNAPSHOT_INTERVAL, catalog=None):
+        if name is None:
+            name = f"{player['name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.player = player
+        self.world = world
+        self.locations = get_location_table(world)
+        self.snapshot_interval = snapshot_interval
+        self.catalog = catalog
+        self.journal_path, self.snapshot_path = journal_paths(directory, name)
+        self.filename = os.path.basename(self.journal_path)
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.journal_path, "a+b") as journal_file:
+                journal_file.seek(0)
+                journal = journal_file.read()
+                # Drop a turn cut off mid-write, or the next delta would be appended to it and both lost.
+                complete = journal.rfind(b"\n") + 1
+                journal_file.truncate(complete)
+                self.entries = journal.count(b"\n")
+            self._remember_state()
+            self.locations.take_changed()
+            self._journal = open(self.journal_path, "a")
+        else:
+            self._journal = None
+            self.snapshot()
+
+    def _remember_state(self):
+        self._player = self.player.to_dict()
+        self._world = {key: copy.deepcopy(value) for key, value in self.world.items() if key not in UNDIFFED_KEYS}
+
+    def record(self):
+        """Append whatever changed since the last call. Returns True if anything was written."""
+        delta = {}
+        player = self.player.to_dict()
+        changed = {key: value for key, value in player.items() if self._player.get(key) != value}
+        if changed:
+            delta["player"] = changed
+        changed = {key: copy.deepcopy(value) for key, value in self.world.items() if key not in UNDIFFED_KEYS and self._world.get(key) != value}
+        if changed:
+            delta["world"] = changed
+        state = self.world.get("state")
+        if isinstance(state, WorldState):
+            events = state.take_new_events()
+            if events:
+                delta["events"] = events
+        locations = self.locations
+        changed = {name: locations[name] if name in locations else None for name in locations.take_changed()}
+        if changed:
+            delta["locations"] = changed
+        if not delta:
+            return False
+
+        self._journal.write(json.dumps(delta) + "\n")
+        self._journal.flush()
+        self._player = player
+        self._world.update(delta.get("world", {}))
+        self.entries += 1
+        if self.entries >= self.snapshot_interval:
+            self.snapshot()
+        return True
+
+    def snapshot(self):
+        """Write the full state to the snapshot file and start an empty journal."""
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "w") as snapshot_file:
+            json.dump({"player": self.player.to_dict(), "world": serialize_world(self.world)}, snapshot_file)
+        os.replace(temporary_path, self.snapshot_path)
+        # Replaying deltas that are already in the snapshot is harmless, so a crash here loses nothing.
+        if self._journal:
+            self._journal.close()
+        self._journal = open(self.journal_path, "w")
+        self.entries = 0
+        self.locations.take_changed()
+        if isinstance(self.world.get("state"), WorldState):
+            self.world["state"].take_new_events()
+        self._remember_state()
+        self._catalog()
+
+    def close(self):
+        self.record()
+        self._journal.close()
+        self._catalog()
+
+    def _catalog(self):
+        if self.catalog is not None:
+            self.catalog.record(self.filename, self._player, self.world)
+
+
+def load_journal(directory, name):
+    """Rebuild (player, world) from a snapshot and the journal written after it."""
+    journal_path, snapshot_path = journal_paths(directory, name)
+    with open(snapshot_path) as snapshot_file:
+        save_data = json.load(snapshot_file)
+    player, world = save_data["player"], save_data["world"]
+
+    if os.path.exists(journal_path):
+        with open(journal_path) as journal_file:
+            for line in journal_file:
+                try:
+                    delta = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # a turn cut off mid-write; everything before it is intact
+                player.update(delta.get("player", {}))
+                world.update(delta.get("world", {}))
+                if "events" in delta:
+                    # game.state replays the log when the world is next used.
+                    state = world.setdefault("state", {"count": 0, "snapshot": {}, "log": []})
+                    state["log"].extend(delta["events"])
+                    state["count"] += len(delta["events"])
+                for location, entry in delta.get("locations", {}).items():
+                    # A removed location stays as None in a saved overlay (see serialize_world()).
+                    if entry is None and "locations_source" not in world:
+                        world["locations"].pop(location, None)
+                    else:
+                        world["locations"][location] = entry
+    return Player.from_dict(player), restore_world(world)
+
+def delete_journal(directory, name):
+    for path in journal_paths(directory, name):
+        if os.path.exists(path):
+            os.remove(path)
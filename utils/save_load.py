@@ -1,75 +1,188 @@
 import json
 import os
-from datetime import datetime
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from game.player import Player
+from game.state import get_world_state
+from game.world import repair_world, serialize_world
+from game.worldgen import restore_world
+from utils.output import say
+from utils.save_binary import BINARY_EXTENSION, read_binary_save, write_binary_save
+from utils.save_catalog import CATALOG_FILENAME, SaveCatalog
+from utils.save_journal import JOURNAL_EXTENSION, SaveJournal, delete_journal, load_journal
+from utils.save_store import STORE_EXTENSION, read_store_save, write_store_save
 
 SAVE_DIRECTORY = "saves"
+SAVE_EXTENSIONS = ('.json', BINARY_EXTENSION, JOURNAL_EXTENSION, STORE_EXTENSION)
+# What read_save_data() raises for a missing or corrupted save.
+LOAD_ERRORS = (OSError, ValueError, KeyError, TypeError)
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_last_timestamp = datetime.min
+_timestamp_lock = threading.Lock()
 
 def ensure_save_directory():
     """Ensure that the save directory exists. Use save_game() to actually save the game."""
     if not os.path.exists(SAVE_DIRECTORY):
         os.makedirs(SAVE_DIRECTORY)
 
-def generate_save_filename(player_name):
-    """Generate a unique filename for the save file. Use save_game() to actually save the game."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{player_name}_{timestamp}.json"
+def get_catalog():
+    """The save directory's catalog. It is built from the files on disk the first time it is needed.
 
-def save_game(player, world):
-    """Save the current game state to a file."""
-    ensure_save_directory()
+    Server workers and the autosave thread call this too, so only one of them builds it.
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None or _catalog.directory != SAVE_DIRECTORY:
+            ensure_save_directory()
+            is_new = not os.path.exists(os.path.join(SAVE_DIRECTORY, CATALOG_FILENAME))
+            catalog = SaveCatalog(SAVE_DIRECTORY)
+            if is_new:
+                catalog.rebuild(read_save_data, SAVE_EXTENSIONS)
+            _catalog = catalog
+        return _catalog
+
+def generate_save_filename(player_name, extension='.json'):
+    """Generate a unique filename for the save file. Use save_game() to actually save the game.
 
+    Timestamps go down to the microsecond and never repeat, so games saved at the same
+    moment under the same name (the server names every nameless player Kevin) stay apart.
+    """
+    global _last_timestamp
+    with _timestamp_lock:
+        _last_timestamp = max(datetime.now(), _last_timestamp + timedelta(microseconds=1))
+        timestamp = _last_timestamp.strftime("%Y%m%d_%H%M%S_%f")
+    return f"{player_name}_{timestamp}{extension}"
+
+def save_game(player, world, extension='.json'):
+    """Save the current game state to a file. The extension picks the format: .json, BINARY_EXTENSION or STORE_EXTENSION."""
     save_data = {
-        "player": player,
-        "world": world
+        "player": player.to_dict(),
+        "world": serialize_world(world)
     }
 
-    filename = generate_save_filename(player["name"])
-    filepath = os.path.join(SAVE_DIRECTORY, filename)
+    filename = generate_save_filename(player["name"], extension)
 
     try:
-        with open(filepath, 'w') as save_file:
-            json.dump(save_data, save_file, indent=2)
-        print(f"Game saved successfully as {filename}")
-    except IOError as e:
-        print(f"Error saving game: {e}")
+        store_save_data(filename, save_data)
+        say(f"Game saved successfully as {filename}")
+    except (OSError, sqlite3.Error) as e:
+        say(f"Error saving game: {e}")
 
-def load_game(filename):
-    """Load a game state from a file."""
-    filepath = os.path.join(SAVE_DIRECTORY, filename)
+def store_save_data(filename, save_data):
+    """Write save_data to the save directory and record it in the catalog. Says nothing, so it can run on any thread."""
+    ensure_save_directory()
+    write_save_data(filename, save_data)
+    get_catalog().record(filename, save_data["player"], save_data["world"])
 
+def write_save_data(filename, save_data, directory=None):
+    """Write {"player": ..., "world": ...} to a save file, replacing any existing one atomically."""
+    directory = directory or SAVE_DIRECTORY
+    filepath = os.path.join(directory, filename)
+    if filename.endswith(BINARY_EXTENSION):
+        write_binary_save(filepath, save_data)
+        return
+    if filename.endswith(STORE_EXTENSION):
+        write_store_save(directory, filename, save_data)
+        return
+    # A temporary file of its own, so two writers of the same save can't interleave.
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=filename + ".", suffix=".tmp")
     try:
+        with os.fdopen(descriptor, 'w') as save_file:
+            json.dump(save_data, save_file, indent=2)
+        os.replace(temporary_path, filepath)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+def start_journal(player, world, filename=None):
+    """Start journaling a game, or continue the journal it was loaded from. Use load_game() to load it back."""
+    ensure_save_directory()
+    return SaveJournal(player, world, SAVE_DIRECTORY, filename, catalog=get_catalog())
+
+def read_save_data(filename, warnings=None):
+    """Read (player, world) from a save file of any supported format, raising on failure.
+
+    What had to be left out to load it is added to the warnings list, if one is given,
+    rather than said, so this can run on any thread.
+    """
+    player, world = _read_save_file(filename)
+    notes = []
+    if "state" in world:
+        # Replay the event log now, so a bad one fails the load rather than the first look.
+        skipped = get_world_state(world).skipped_events
+        if skipped:
+            notes.append(f"Ignoring {len(skipped)} saved world event(s) this version doesn't know: {', '.join(sorted(set(skipped)))}")
+    notes.extend(repair_world(world))
+    if player["location"] not in world["locations"]:
+        player["location"] = world["current_location"]
+    if warnings is not None:
+        warnings.extend(notes)
+    return player, world
+
+def _read_save_file(filename):
+    if filename.endswith(JOURNAL_EXTENSION):
+        return load_journal(SAVE_DIRECTORY, filename)
+    filepath = os.path.join(SAVE_DIRECTORY, filename)
+    if filename.endswith(BINARY_EXTENSION):
+        save_data = read_binary_save(filepath)
+    elif filename.endswith(STORE_EXTENSION):
+        save_data = read_store_save(SAVE_DIRECTORY, filename)
+    else:
         with open(filepath, 'r') as save_file:
             save_data = json.load(save_file)
-        print(f"Game loaded successfully from {filename}")
-        return save_data["player"], save_data["world"]
+    return Player.from_dict(save_data["player"]), restore_world(save_data["world"])
+
+def load_game(filename):
+    """Load a game state from a file."""
+    warnings = []
+    try:
+        player, world = read_save_data(filename, warnings)
+        for warning in warnings:
+            say(warning)
+        say(f"Game loaded successfully from {filename}")
+        return player, world
     except IOError as e:
-        print(f"Error loading game: {e}")
+        say(f"Error loading game: {e}")
         return None, None
     except json.JSONDecodeError:
-        print(f"Error: The save file {filename} is corrupted.")
+        say(f"Error: The save file {filename} is corrupted.")
+        return None, None
+    except (ValueError, KeyError, TypeError) as e:
+        # KeyError and TypeError: a save missing a required key, or with one of the wrong shape.
+        say(f"Error: The save file {filename} is corrupted ({e!r}).")
         return None, None
 
 def list_save_files():
-    """List all available save files. Use load_most_recent_save() to load the most recent save."""
-    ensure_save_directory()
-    save_files = [f for f in os.listdir(SAVE_DIRECTORY) if f.endswith('.json')]
-    return save_files
+    """List all available save files, oldest first. Use load_most_recent_save() to load the most recent save."""
+    return get_catalog().filenames()
+
+def list_saves():
+    """Metadata (player, location, health, gold, size, saved_at) for every save, oldest first."""
+    return get_catalog().entries()
 
 def delete_save_file(filename):
     """Delete a save file. Use list_save_files() to list all available save files."""
     filepath = os.path.join(SAVE_DIRECTORY, filename)
     try:
-        os.remove(filepath)
-        print(f"Save file {filename} deleted successfully.")
+        if filename.endswith(JOURNAL_EXTENSION):
+            delete_journal(SAVE_DIRECTORY, filename)
+        else:
+            os.remove(filepath)
+        get_catalog().remove(filename)
+        say(f"Save file {filename} deleted successfully.")
     except OSError as e:
-        print(f"Error deleting save file: {e}")
+        say(f"Error deleting save file: {e}")
 
-def load_most_recent_save():
-    """Load the most recent save file. Use list_save_files() to list all available save files."""
-    save_files = list_save_files()
-    if not save_files:
-        print("No save files found.")
+def load_most_recent_save(player_name=None):
+    """Load the most recent save file, optionally only among one player's saves. Use list_save_files() to list all available save files."""
+    most_recent = get_catalog().most_recent(player_name)
+    if most_recent is None:
+        say("No save files found.")
         return None, None
 
-    most_recent = max(save_files, key=lambda f: os.path.getmtime(os.path.join(SAVE_DIRECTORY, f)))
     return load_game(most_recent)
@@ -0,0 +1,183 @@
+"""The save file schema, migrations for older saves, and a parallel checker for a save directory.
+
+Older saves predate keys the game now adds on the fly (the world's ``weather``, the
+player's ``agility`` and ``perception``), and may have a description that grew each time
+the torch was lit. MIGRATIONS bring a save up to the current shape;
+validate_save() lists whatever is still wrong with it. Check every save from the
+repository root, migrating old ones in place, with ``python -m utils.save_schema``.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from game.weather import DEFAULT_WEATHER
+from game.world import LOCATION_NOTES
+from utils.save_binary import BINARY_EXTENSION, read_binary_save
+from utils.save_journal import JOURNAL_EXTENSION, journal_paths
+from utils.save_load import SAVE_DIRECTORY, SAVE_EXTENSIONS, write_save_data
+from utils.save_store import STORE_EXTENSION, read_store_save
+
+STATUSES = ("ok", "migrated", "outdated", "invalid", "unreadable", "unwritable")
+FAILURES = ("invalid", "unreadable", "unwritable")
+DEFAULT_STAT = 10
+LIT_NOTE = LOCATION_NOTES["lit"]
+
+PLAYER_SCHEMA = {"name": str, "health": int, "inventory": list, "location": str, "gold": int, "agility": int, "perception": int}
+WORLD_SCHEMA = {"current_location": str, "locations": dict, "weather": str}
+LOCATION_SCHEMA = {"description": str, "connections": list, "items": list}
+
+
+def add_weather(save_data):
+    """Saves from before game.weather have no weather."""
+    if "weather" in save_data["world"]:
+        return False
+    save_data["world"]["weather"] = DEFAULT_WEATHER
+    return True
+
+def add_player_stats(save_data):
+    """Saves from before weather effects have no agility or perception."""
+    player = save_data["player"]
+    missing = [stat for stat in ("agility", "perception") if stat not in player]
+    for stat in missing:
+        player[stat] = DEFAULT_STAT
+    return bool(missing)
+
+def flag_lit_locations(save_data):
+    """Saves from before world events lit a location by appending to its description, once per torch."""
+    world = save_data["world"]
+    lit = [name for name, entry in world["locations"].items() if entry is not None and LIT_NOTE in entry["description"]]
+    for name in lit:
+        entry = world["locations"][name]
+        entry["description"] = entry["description"].replace(" " + LIT_NOTE, "").replace(LIT_NOTE, "")
+    if lit:
+        state = world.setdefault("state", {"count": 0, "snapshot": {}, "log": []})
+        state["log"].extend(["light_location", {"location": name}] for name in lit)
+        state["count"] += len(lit)
+    return bool(lit)
+
+MIGRATIONS = [add_weather, add_player_stats, flag_lit_locations]
+
+
+def _check(value, schema, where):
+    if not isinstance(value, dict):
+        return [f"{where} is not an object"]
+    problems = []
+    for key, expected in schema.items():
+        if key not in value:
+            problems.append(f"{where} has no {key}")
+        elif not isinstance(value[key], expected) or isinstance(value[key], bool):
+            problems.append(f"{where}.{key} should be a {expected.__name__}")
+    return problems
+
+def validate_save(save_data):
+    """A list of everything wrong with a decoded save; empty if it is valid."""
+    problems = _check(save_data, {"player": dict, "world": dict}, "save")
+    if problems:
+        return problems
+    player, world = save_data["player"], save_data["world"]
+    problems = _check(player, PLAYER_SCHEMA, "player") + _check(world, WORLD_SCHEMA, "world")
+    if problems:
+        return problems
+    if not 0 <= player["health"] <= 100:
+        problems.append(f"player.health {player['health']} is out of range")
+    if player["gold"] < 0:
+        problems.append(f"player.gold {player['gold']} is negative")
+    for name, entry in world["locations"].items():
+        # A saved overlay marks locations removed from its template with None.
+        if entry is not None or "locations_source" not in world:
+            problems.extend(_check(entry, LOCATION_SCHEMA, f"locations[{name!r}]"))
+    # Generated worlds only save the locations that changed, so the rest can't be checked here.
+    if "locations_source" not in world and world["current_location"] not in world["locations"]:
+        problems.append(f"world.current_location {world['current_location']!r} is not a location")
+    return problems
+
+def migrate_save(save_data):
+    """Apply every migration in order. Returns the names of the ones that changed the save."""
+    return [migration.__name__ for migration in MIGRATIONS if migration(save_data)]
+
+
+def _read(directory, filename):
+    if filename.endswith(BINARY_EXTENSION):
+        return read_binary_save(os.path.join(directory, filename))
+    if filename.endswith(STORE_EXTENSION):
+        return read_store_save(directory, filename)
+    with open(os.path.join(directory, filename)) as save_file:
+        return json.load(save_file)
+
+def check_save(directory, filename, migrate=True):
+    """Validate (and migrate) one save. Returns (filename, status, details, bytes read).
+
+    status is one of STATUSES; "outdated" means a migration applies but migrate was False.
+    A journaled save is checked and migrated through its snapshot; the deltas after it only
+    replace values.
+    """
+    if filename.endswith(JOURNAL_EXTENSION):
+        filename = os.path.basename(journal_paths(directory, filename)[1])
+    try:
+        size = os.path.getsize(os.path.join(directory, filename))
+        save_data = _read(directory, filename)
+    except (OSError, ValueError, KeyError) as e:
+        return filename, "unreadable", [str(e)], 0
+    problems = _check(save_data, {"player": dict, "world": dict}, "save")
+    if problems:
+        return filename, "invalid", problems, size
+
+    migrations = migrate_save(save_data)
+    problems = validate_save(save_data)
+    if problems:
+        return filename, "invalid", problems, size
+    if not migrations:
+        return filename, "ok", [], size
+    if not migrate:
+        return filename, "outdated", migrations, size
+    try:
+        write_save_data(filename, save_data, directory)
+    except OSError as e:
+        return filename, "unwritable", [str(e)], size
+    return filename, "migrated", migrations, size
+
+def check_directory(directory, extensions, workers=None, migrate=True):
+    """Check every save in a directory across a process pool. Returns (results, seconds)."""
+    filenames = [entry.name for entry in os.scandir(directory) if entry.name.endswith(extensions)]
+    workers = workers or os.cpu_count()
+    started = time.perf_counter()
+    job = partial(check_save, directory, migrate=migrate)
+    if workers == 1:
+        results = [job(filename) for filename in filenames]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(job, filenames, chunksize=max(1, min(512, len(filenames) // (workers * 4)))))
+    return results, time.perf_counter() - started
+
+def print_report(results, seconds, limit=20):
+    counts = {}
+    for _, status, _, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    total_bytes = sum(size for _, _, _, size in results)
+    print(f"Checked {len(results)} saves in {seconds:.2f}s "
+          f"({len(results) / seconds if seconds else 0:.0f} saves/s, {total_bytes / 1e6 / seconds if seconds else 0:.1f} MB/s)")
+    for status in STATUSES:
+        print(f"{status:>11}: {counts.get(status, 0)}")
+    failures = [result for result in results if result[1] in FAILURES]
+    for filename, status, details, _ in failures[:limit]:
+        print(f"{filename} ({status}): {'; '.join(details)}")
+    if len(failures) > limit:
+        print(f"... and {len(failures) - limit} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate every save in a directory and migrate old ones in place.")
+    parser.add_argument("--directory", default=SAVE_DIRECTORY)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: all cores)")
+    parser.add_argument("--check-only", action="store_true", help="report old saves without migrating them")
+    args = parser.parse_args(argv)
+
+    results, seconds = check_directory(args.directory, SAVE_EXTENSIONS, args.workers, not args.check_only)
+    print_report(results, seconds)
+    return 1 if any(status in FAILURES for _, status, _, _ in results) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
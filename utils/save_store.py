@@ -0,0 +1,168 @@
+"""A content-addressed, compressed save store.
+
+A store save is a small JSON manifest (``<name>.manifest``) listing the hashes of its
+chunks: the player, the inventory, the top-level world state and one chunk per location.
+Chunks live in ``<save directory>/chunks`` named by the SHA-256 of their canonical JSON and
+compressed with zlib or lzma, so a chunk shared by many saves (an untouched location, say)
+is stored once and a new save only writes the chunks that changed. Deleting a manifest
+leaves its chunks behind; reclaim them from the repository root with
+``python -m utils.save_store --gc``. A save being written has chunks no manifest names yet,
+so collection leaves anything modified in the last GC_GRACE_SECONDS alone, and writers
+touch the chunks they reuse.
+"""
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import tempfile
+import time
+import zlib
+
+from game.world import serialize_world
+
+STORE_EXTENSION = ".manifest"
+CHUNK_DIRECTORY = "chunks"
+COMPRESSORS = {
+    "zlib": (b"z", lambda data: zlib.compress(data, 9)),
+    "lzma": (b"x", lzma.compress),
+}
+DECOMPRESSORS = {b"z": zlib.decompress, b"x": lzma.decompress}
+GC_GRACE_SECONDS = 3600
+
+
+def chunk_path(directory, digest):
+    return os.path.join(directory, CHUNK_DIRECTORY, digest[:2], digest)
+
+def _write_atomically(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as chunk_file:
+        chunk_file.write(data)
+    os.replace(temporary_path, path)
+
+def put_chunk(directory, value, compression="zlib"):
+    """Store a JSON value unless an identical one is already stored. Returns its hash."""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    digest = hashlib.sha256(data).hexdigest()
+    path = chunk_path(directory, digest)
+    try:
+        if hashlib.sha256(_read_chunk(path, digest)).hexdigest() == digest:
+            os.utime(path)  # so collect_garbage() keeps it until this save's manifest is written
+            return digest
+    except (OSError, ValueError):
+        pass  # missing or damaged: write it afresh
+    tag, compress = COMPRESSORS[compression]
+    _write_atomically(path, tag + compress(data))
+    return digest
+
+def _read_chunk(path, digest):
+    with open(path, "rb") as chunk_file:
+        data = chunk_file.read()
+    try:
+        return DECOMPRESSORS[data[:1]](data[1:])
+    except (KeyError, zlib.error, lzma.LZMAError):
+        raise ValueError(f"chunk {digest} is damaged") from None
+
+def get_chunk(directory, digest):
+    return json.loads(_read_chunk(chunk_path(directory, digest), digest))
+
+
+def write_store_save(directory, filename, save_data, compression="zlib"):
+    """Store {"player": ..., "world": ...} and write its manifest as filename."""
+    player = dict(save_data["player"])
+    world = save_data["world"]
+    manifest = {
+        "compression": compression,
+        "player": put_chunk(directory, {key: value for key, value in player.items() if key != "inventory"}, compression),
+        "inventory": put_chunk(directory, player.get("inventory", []), compression),
+        "world": put_chunk(directory, {key: value for key, value in world.items() if key != "locations"}, compression),
+        "locations": {name: put_chunk(directory, entry, compression) for name, entry in world["locations"].items()},
+    }
+    _write_atomically(os.path.join(directory, filename), json.dumps(manifest, separators=(",", ":")).encode())
+
+def read_store_save(directory, filename):
+    """Reassemble {"player": ..., "world": ...} from a manifest and its chunks."""
+    with open(os.path.join(directory, filename)) as manifest_file:
+        manifest = json.load(manifest_file)
+    player = get_chunk(directory, manifest["player"])
+    player["inventory"] = get_chunk(directory, manifest["inventory"])
+    world = get_chunk(directory, manifest["world"])
+    world["locations"] = {name: get_chunk(directory, digest) for name, digest in manifest["locations"].items()}
+    return {"player": player, "world": world}
+
+def manifest_chunks(manifest):
+    return [manifest["player"], manifest["inventory"], manifest["world"], *manifest["locations"].values()]
+
+def collect_garbage(directory, grace=GC_GRACE_SECONDS):
+    """Delete chunks no manifest refers to, and leftover temporary files, untouched for grace seconds.
+
+    Returns (chunks removed, bytes freed).
+    """
+    cutoff = time.time() - grace
+    referenced = set()
+    for filename in os.listdir(directory):
+        if filename.endswith(STORE_EXTENSION):
+            with open(os.path.join(directory, filename)) as manifest_file:
+                referenced.update(manifest_chunks(json.load(manifest_file)))
+
+    removed = freed = 0
+    for root, _, filenames in os.walk(os.path.join(directory, CHUNK_DIRECTORY)):
+        for filename in filenames:
+            if filename in referenced:
+                continue
+            path = os.path.join(root, filename)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue  # possibly part of a save still being written
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            freed += stat.st_size
+            removed += 1
+    return removed, freed
+
+def store_size(directory):
+    """Bytes used by every manifest and chunk in the directory."""
+    total = sum(os.path.getsize(os.path.join(directory, filename))
+                for filename in os.listdir(directory) if filename.endswith(STORE_EXTENSION))
+    for root, _, filenames in os.walk(os.path.join(directory, CHUNK_DIRECTORY)):
+        total += sum(os.path.getsize(os.path.join(root, filename)) for filename in filenames)
+    return total
+
+
+def main(argv=None):
+    from utils.save_load import SAVE_DIRECTORY, delete_save_file, get_catalog, read_save_data
+
+    parser = argparse.ArgumentParser(description="Convert saves into the content-addressed store, or collect unused chunks.")
+    parser.add_argument("filenames", nargs="*", help="saves in the save directory to convert")
+    parser.add_argument("--compression", choices=sorted(COMPRESSORS), default="zlib")
+    parser.add_argument("--remove", action="store_true", help="delete each save after converting it")
+    parser.add_argument("--gc", action="store_true", help="delete chunks no manifest refers to")
+    parser.add_argument("--grace", type=float, default=GC_GRACE_SECONDS, metavar="SECONDS",
+                        help="with --gc, keep unreferenced chunks modified this recently (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    converted = 0
+    for filename in args.filenames:
+        try:
+            player, world = read_save_data(filename)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error converting {filename}: {e}")
+            continue
+        manifest = os.path.splitext(filename)[0] + STORE_EXTENSION
+        write_store_save(SAVE_DIRECTORY, manifest, {"player": player.to_dict(), "world": serialize_world(world)}, args.compression)
+        get_catalog().record(manifest, player, world)
+        if args.remove:
+            delete_save_file(filename)
+        converted += 1
+        print(f"{filename} -> {manifest}")
+    if args.gc:
+        removed, freed = collect_garbage(SAVE_DIRECTORY, args.grace)
+        print(f"Removed {removed} unused chunks ({freed} bytes).")
+    if converted or args.gc:
+        print(f"The store now uses {store_size(SAVE_DIRECTORY)} bytes.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Headless batch simulation of game sessions.
+
+Run from the repository root with ``python -m utils.simulation --games 10000``. Every game
+answers prompts with a policy: random valid input by default, or the lines of a file with
+``--script inputs.txt``, one answer per line, ending the game when they run out.
+"""
+import argparse
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.actions import perform_action
+from game.player import create_player
+from game.world import get_available_locations, get_current_location, initialize_world
+from utils.output import NullSink, using_sink
+from utils.prompts import drive
+
+MAIN_PROMPT = "What would you like to do? "
+INPUTS_PER_TURN = 50
+
+MENU_CHOICE = re.compile(r"\(1-(\d+)\)")
+SHOP_CHOICES = ["bread", "torch", "rope", "sword", "exit", "exit"]
+COMMAND_WEIGHTS = [("move", 35), ("pickup", 20), ("use", 15), ("interact", 15), ("look", 5), ("drop", 5), ("status", 5)]
+
+
+class SessionOver(Exception):
+    """Raised from the input hook to end a simulated session early."""
+
+
+def random_policy(rng, prompt, player, world):
+    """Answer any game prompt with a random but valid input."""
+    if prompt == MAIN_PROMPT:
+        return random_command(rng, player, world)
+    menu = MENU_CHOICE.search(prompt)
+    if menu:
+        return str(rng.randint(1, int(menu.group(1))))
+    if "y/n" in prompt:
+        return rng.choice("yn")
+    if "buy" in prompt:
+        return rng.choice(SHOP_CHOICES)
+    return ""
+
+def random_command(rng, player, world):
+    """Pick a random top-level command that makes sense in the current state."""
+    verb = rng.choices([c[0] for c in COMMAND_WEIGHTS], weights=[c[1] for c in COMMAND_WEIGHTS])[0]
+    items_here = world["locations"][get_current_location(world)]["items"]
+    if verb == "move":
+        return f"move {rng.choice(get_available_locations(world))}"
+    if verb == "pickup" and items_here:
+        return f"pickup {rng.choice(items_here)}"
+    if verb in ("use", "drop") and player["inventory"]:
+        return f"{verb} {rng.choice(list(player['inventory'].distinct()))}"
+    if verb in ("pickup", "use", "drop"):
+        return "look"
+    return verb
+
+
+class ScriptedPolicy:
+    """Replay a fixed list of inputs, ending the session when it runs out."""
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as script_file:
+            return cls(line.rstrip("\n") for line in script_file)
+
+    def __call__(self, rng, prompt, player, world):
+        if self.position >= len(self.lines):
+            raise SessionOver()
+        line = self.lines[self.position]
+        self.position += 1
+        return line
+
+
+POLICIES = {
+    "random": random_policy,
+}
+
+
+def run_session(seed, policy="random", max_turns=200):
+    """Play one game without a terminal and return its outcome."""
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    elif isinstance(policy, ScriptedPolicy):
+        policy = ScriptedPolicy(policy.lines)  # every game replays the script from its first line
+    random.seed(seed)
+    rng = random.Random(f"policy-{seed}")
+    player = create_player("Kevin")
+    world = initialize_world()
+    turns = 0
+    inputs = 0
+
+    def respond(prompt=""):
+        nonlocal inputs
+        inputs += 1
+        if player["health"] == 0 or inputs > max_turns * INPUTS_PER_TURN:
+            raise SessionOver()
+        return policy(rng, prompt, player, world)
+
+    with using_sink(NullSink()):
+        try:
+            while turns < max_turns and player["health"] > 0:
+                action = respond(MAIN_PROMPT).lower()
+                turns += 1
+                if action == "quit":
+                    break
+                drive(perform_action(player, world, action), respond)
+        except SessionOver:
+            pass
+
+    return {
+        "seed": seed,
+        "turns": turns,
+        "died": player["health"] == 0,
+        "health": player["health"],
+        "gold": player["gold"],
+        "items": len(player["inventory"]),
+        "location": get_current_location(world),
+    }
+
+def _run_job(job):
+    return run_session(*job)
+
+def run_batch(games, policy="random", max_turns=200, workers=None, seed=0):
+    """Play many games across a process pool. Returns (results, elapsed_seconds)."""
+    jobs = [(seed + i, policy, max_turns) for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, games // (workers * 8))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run_job, jobs, chunksize=chunksize))
+    return results, time.perf_counter() - start
+
+def summarize(results, elapsed):
+    """Aggregate per-game outcomes into a report dict."""
+    games = len(results)
+    if not games:
+        return {"games": 0, "games_per_second": 0.0}
+    deaths = sum(result["died"] for result in results)
+    return {
+        "games": games,
+        "deaths": deaths,
+        "death_rate": deaths / games,
+        "mean_turns": sum(result["turns"] for result in results) / games,
+        "mean_gold": sum(result["gold"] for result in results) / games,
+        "mean_items": sum(result["items"] for result in results) / games,
+        "max_gold": max(result["gold"] for result in results),
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed if elapsed else float("inf"),
+    }
+
+def print_report(report):
+    """Print a simulation report."""
+    for key, value in report.items():
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        print(f"{key:>18}: {value}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many headless games and report aggregate outcomes.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=200, help="maximum turns per game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--script", metavar="FILE", help="answer every prompt with the next line of FILE instead of a policy")
+    args = parser.parse_args(argv)
+
+    policy = ScriptedPolicy.from_file(args.script) if args.script else args.policy
+    results, elapsed = run_batch(args.games, policy, args.turns, args.workers, args.seed)
+    print_report(summarize(results, elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Startup-time budget: how long ``python main.py`` takes to show its first prompt.
+
+Starts main.py a few times with its output on a pipe, times each run until the first prompt
+appears, and checks the median against a budget. It also checks that no module in
+LAZY_MODULES was imported before the prompt: those should wait until the game needs them.
+Exits with status 1 when either check fails, so it can gate a build. Run from the repository
+root with ``python -m utils.startup --runs 5``, adding ``--importtime`` to list the slowest
+imports.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+STARTUP_BUDGET = 0.3
+FIRST_PROMPT = b"Do you want to load a saved game?"
+LAZY_MODULES = ("locations.", "plugins.")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_to_prompt(timeout=10.0):
+    """Seconds from starting main.py to its first prompt."""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        output = b""
+        while FIRST_PROMPT not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk or time.perf_counter() - started > timeout:
+                raise RuntimeError(f"main.py exited or stalled before its first prompt: {output[-200:]!r}")
+            output += chunk
+        return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+
+def eager_imports():
+    """Modules from LAZY_MODULES that importing main already loads."""
+    code = "import sys, main; print('\\n'.join(sorted(sys.modules)))"
+    modules = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+    return [module for module in modules if module.startswith(LAZY_MODULES)]
+
+def slowest_imports(count):
+    """(cumulative microseconds, module) for the count slowest imports of main, from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, capture_output=True, text=True, check=True)
+    timings = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            timings.append((int(parts[1]), parts[2].strip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that main.py reaches its first prompt within a time budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="seconds allowed for the median run")
+    parser.add_argument("--importtime", type=int, nargs="?", const=15, default=0, metavar="COUNT", help="list the slowest imports")
+    args = parser.parse_args(argv)
+
+    timings = sorted(time_to_prompt() for _ in range(args.runs))
+    median = statistics.median(timings)
+    print(f"first prompt after {median * 1000:.1f} ms (median of {args.runs}; fastest {timings[0] * 1000:.1f} ms, "
+          f"slowest {timings[-1] * 1000:.1f} ms; budget {args.budget * 1000:.0f} ms)")
+    eager = eager_imports()
+    for module in eager:
+        print(f"{module} is imported at startup but should load lazily")
+    for microseconds, module in slowest_imports(args.importtime) if args.importtime else ():
+        print(f"{microseconds / 1000:8.1f} ms  {module}")
+    if median > args.budget or eager:
+        print("over budget" if median > args.budget else "lazy modules imported eagerly")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
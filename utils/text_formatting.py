@@ -1,5 +1,7 @@
 import textwrap
 
+from utils.output import say
+
 
 def wrap_text(text, width=80):
     """Wrap text to a specified width."""
@@ -18,13 +20,14 @@ Type 'help' at any time to see available commands.
 
 Your journey begins now. Good luck, adventurer!
     """
-    print(welcome_text.strip())
+    say(welcome_text.strip())
 
 def print_help():
     """Print a formatted help message with available commands."""
     help_text = """
 Available commands:
 - move [location]: Move to a new location
+- travel [location]: Travel to any location along the shortest route
 - look: Examine your surroundings
 - inventory: Check your inventory
 - pickup [item]: Pick up an item
@@ -35,23 +38,28 @@ Available commands:
 - interact: Interact with your current location
 - help: Show this help message
 - quit: Save and exit the game
+
+Commands can be shortened to any prefix only they start with ("ex" for examine), and so can
+location and item names. Separate several commands with ";" to run them in turn.
     """
-    print(help_text.strip())
+    say(help_text.strip())
 
 def format_inventory(inventory):
     """Format the player's inventory for display."""
     if not inventory:
         return "empty"
+    if hasattr(inventory, "stacks"):
+        return ", ".join(item if count == 1 else f"{item} x{count}" for item, count in inventory.stacks())
     return ", ".join(inventory)
 
 def print_separator(char="-", length=80):
     """Print a separator line."""
-    print(char * length)
+    say(char * length)
 
 def print_event(event_text):
     """Print a formatted event message."""
     print_separator()
-    print(wrap_text(event_text))
+    say(wrap_text(event_text))
     print_separator()
 
 def print_game_over():
@@ -62,5 +70,5 @@ def print_game_over():
     Your adventure has come to an end. Thank you for playing!
     """
     print_separator("=")
-    print(game_over_text)
+    say(game_over_text)
     print_separator("=")